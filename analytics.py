@@ -0,0 +1,177 @@
+"""Module with difficulty statistics of many random boards.
+
+3BV is the smallest number of clicks to clear a board without flags: one
+for every opening, a connected region of empty cells which is opened at
+once with the numbers around it, and one for every number which is not
+next to an opening. Boards are generated in batches with the same
+distribution as Board.create_mines and measured at once with NumPy, on
+all cores. Histograms of the statistics are written to a CSV file.
+
+Example: python analytics.py --boards 1000000 --mines 8 10 12 --csv stats.csv
+"""
+
+import argparse
+import csv
+import multiprocessing
+import time
+
+import numpy as np
+
+from board import board_metrics, neighbour_table
+from settings import Settings
+
+# Statistics with a histogram, opening sizes are counted for every opening
+# and the others for every board.
+METRICS = ("3bv", "openings", "opening_size", "isolated")
+
+
+def random_mines(generator, boards, cells_x, cells_y, mines, excluded=()):
+    """Return masks of mines of boards, without mines in excluded cells.
+
+    Like in Board.create_mines, every other cell is equally likely to get
+    a mine.
+    """
+    size = cells_x * cells_y
+    masks = np.zeros((boards, size), dtype=bool)
+    if mines:
+        # Cells with the smallest random keys get the mines.
+        keys = generator.random((boards, size))
+        keys[:, list(excluded)] = 2
+        chosen = np.argpartition(keys, mines - 1, axis=1)[:, :mines]
+        masks[np.arange(boards)[:, None], chosen] = True
+    return masks.reshape(boards, cells_y, cells_x)
+
+
+def excluded_cells(cells_x, cells_y, start=None, safe_area=False):
+    """Return flat indexes of cells that never get a mine.
+
+    Start is the row and column of the first opened cell, with safe_area
+    its neighbours are excluded too.
+    """
+    if start is None:
+        return []
+    cell = start[0] * cells_x + start[1]
+    excluded = [cell]
+    if safe_area:
+        offsets, indexes = neighbour_table(cells_y, cells_x)
+        excluded += indexes[offsets[cell]:offsets[cell + 1]].tolist()
+    return excluded
+
+
+def measure_chunk(arguments):
+    """Measure a chunk of boards in a worker, return their histograms."""
+    cells_x, cells_y, mines, seed, chunk, boards, excluded = arguments
+    # Every chunk has its own generator, so results don't depend on the
+    # number of workers.
+    generator = np.random.default_rng([seed, cells_x, cells_y, mines, chunk])
+    metrics = board_metrics(random_mines(generator, boards, cells_x,
+                                         cells_y, mines, excluded))
+    return {name: np.bincount(metrics[name]) for name in METRICS}
+
+
+def add_histograms(total, histograms):
+    """Add histograms to the total histograms by metric."""
+    for name, histogram in histograms.items():
+        old = total.get(name, np.zeros(0, dtype=np.int64))
+        if len(old) < len(histogram):
+            old, histogram = histogram, old
+        old = old.astype(np.int64)
+        old[:len(histogram)] += histogram
+        total[name] = old
+
+
+def analyse(boards, cells_x, cells_y, mines, seed=0, workers=1,
+            chunk_size=10000, start=None, safe_area=False):
+    """Measure random boards and return histograms by metric."""
+    excluded = excluded_cells(cells_x, cells_y, start, safe_area)
+    if cells_x * cells_y - len(excluded) < mines:
+        raise ValueError("Too many mines for a safe first cell.")
+    chunks = [(cells_x, cells_y, mines, seed, index,
+               min(chunk_size, boards - first), excluded)
+              for index, first in enumerate(range(0, boards, chunk_size))]
+
+    histograms = {}
+    if workers == 1:
+        for chunk in chunks:
+            add_histograms(histograms, measure_chunk(chunk))
+    else:
+        # Histograms are added as chunks finish, only they are kept.
+        with multiprocessing.Pool(workers) as pool:
+            for chunk_histograms in pool.imap_unordered(measure_chunk,
+                                                        chunks):
+                add_histograms(histograms, chunk_histograms)
+    return histograms
+
+
+def summary(histogram):
+    """Return mean and percentiles of values with their histogram."""
+    values = np.arange(len(histogram))
+    total = histogram.sum()
+    cumulative = np.cumsum(histogram)
+    report = {"mean": float(values @ histogram / total) if total else 0.0}
+    for percentile in (10, 50, 90):
+        report[f"p{percentile}"] = int(np.searchsorted(
+            cumulative, percentile / 100 * total))
+    return report
+
+
+def write_csv(path, results):
+    """Write histograms of (cells_x, cells_y, mines) to a CSV file."""
+    with open(path, "w", newline="") as file_object:
+        writer = csv.writer(file_object)
+        writer.writerow(("cells_x", "cells_y", "mines", "metric", "value",
+                         "count"))
+        for (cells_x, cells_y, mines), histograms in results.items():
+            for name in METRICS:
+                histogram = histograms[name]
+                for value in np.flatnonzero(histogram).tolist():
+                    writer.writerow((cells_x, cells_y, mines, name, value,
+                                     int(histogram[value])))
+
+
+def main():
+    """Parse command line arguments and print statistics of the boards."""
+    settings = Settings()
+    parser = argparse.ArgumentParser(
+        description="Difficulty statistics of random Minesweeper boards.")
+    parser.add_argument("--boards", type=int, default=100000)
+    parser.add_argument("--cells-x", type=int, default=settings.cells_x)
+    parser.add_argument("--cells-y", type=int, default=settings.cells_y)
+    parser.add_argument("--mines", type=int, nargs="+",
+                        default=[settings.mines],
+                        help="numbers of mines to compare")
+    parser.add_argument("--start", type=int, nargs=2,
+                        metavar=("ROW", "COLUMN"),
+                        help="first opened cell, which never has a mine")
+    parser.add_argument("--safe-area", action="store_true",
+                        help="neighbours of the first cell have no mines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--csv", metavar="FILE",
+                        help="write histograms to a CSV file")
+    args = parser.parse_args()
+
+    results = {}
+    for mines in args.mines:
+        start = time.perf_counter()
+        histograms = analyse(args.boards, args.cells_x, args.cells_y, mines,
+                             args.seed, args.workers, args.chunk_size,
+                             args.start, args.safe_area)
+        duration = time.perf_counter() - start
+        results[(args.cells_x, args.cells_y, mines)] = histograms
+
+        print(f"{args.boards} boards {args.cells_x}x{args.cells_y} "
+              f"({mines} mines), {args.boards / duration:.0f} per second")
+        for name in METRICS:
+            report = summary(histograms[name])
+            print(f"  {name:12} mean {report['mean']:7.2f}  "
+                  f"p10 {report['p10']:4}  p50 {report['p50']:4}  "
+                  f"p90 {report['p90']:4}")
+    if args.csv:
+        write_csv(args.csv, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Module with Atlas class for Minesweeper."""
+
+import os
+
+import pygame
+
+# Cell images in the order of tile codes from board.py, so the tile code
+# of a cell is the index of its image.
+CELL_IMAGES = (
+    "cell_open", "cell_1", "cell_2", "cell_3", "cell_4", "cell_5", "cell_6",
+    "cell_7", "cell_8", "cell_closed", "cell_flagged", "mine_open",
+    "mine_exploded", "mine_wrong")
+
+# Emoji images in the order of button's current_emoji values:
+# dead ... 0, normal ... 1, solved ... 2, o ... -1
+EMOJI_IMAGES = ("emoji_dead", "emoji", "emoji_solved", "emoji_o")
+
+# Digit images for the scoreboards, index is the digit.
+DIGIT_IMAGES = tuple(f"time_{digit}" for digit in range(10))
+
+# Colours of lit and unlit segments of the digit images
+SEGMENT_ON = (255, 0, 0)
+SEGMENT_OFF = (128, 0, 0)
+
+# Loaded atlases, one for every scale.
+_atlases = {}
+
+
+class Atlas:
+    """Class to hold all game images scaled to one scale."""
+
+    def __init__(self, my_path, scale):
+        """Load and scale every image once."""
+        self.scale = scale
+        self.cell_size = int(16 * scale)
+        self.emoji_size = int(26 * scale)
+
+        self.cells = self._load_images(
+            my_path, CELL_IMAGES, (self.cell_size, self.cell_size))
+        self.emojis = self._load_images(
+            my_path, EMOJI_IMAGES, (self.emoji_size, self.emoji_size))
+        self.digits = self._load_images(
+            my_path, DIGIT_IMAGES, (int(13 * scale), int(23 * scale)))
+        self.minus = self._make_minus(self.digits[8], scale)
+
+    @staticmethod
+    def _load_images(my_path, names, size):
+        """Load images with given names and scale them to size."""
+        images = []
+        for name in names:
+            image = pygame.image.load(
+                os.path.join(my_path, f"images/{name}.bmp"))
+            images.append(pygame.transform.scale(image, size).convert())
+        return tuple(images)
+
+    @staticmethod
+    def _make_minus(eight, scale):
+        """Make a minus sign from the digit 8 with only the middle lit."""
+        minus = eight.copy()
+        # Turn off every segment, then copy the lit middle one back.
+        with pygame.PixelArray(minus) as pixels:
+            pixels.replace(SEGMENT_ON, SEGMENT_OFF)
+        middle = pygame.Rect(int(2 * scale), int(10 * scale),
+                             int(9 * scale), int(3 * scale))
+        minus.blit(eight, middle, middle)
+        return minus
+
+
+def get_atlas(my_path, scale):
+    """Return the atlas for scale, load it on the first request."""
+    atlas = _atlases.get(scale)
+    if atlas is None:
+        atlas = Atlas(my_path, scale)
+        _atlases[scale] = atlas
+    return atlas
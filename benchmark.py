@@ -0,0 +1,237 @@
+"""Benchmarks of the game logic and rendering, run without a display.
+
+Example: python benchmark.py --baseline benchmark_baseline.json
+Results and memory of the boards are printed as JSON. With --baseline the
+benchmarks that got slower than the baseline by more than the tolerance
+are listed and the script exits with status 1. --save-baseline stores the
+results instead.
+"""
+
+import os
+
+# Pygame has to use the dummy drivers before it is imported.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Keep the output clean JSON.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from board import Board, label_regions
+from settings import Settings
+
+# Board sizes as (cells_x, cells_y, mines)
+SIZES = {
+    "beginner": (8, 8, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (30, 16, 99),
+    "large": (100, 100, 1000),
+    "huge": (1000, 1000, 10000),
+}
+
+
+def _new_board(size, index_regions=False):
+    """Return a board of the size with mines and indexed regions."""
+    board = Board(*size, seed=0, index_regions=index_regions)
+    board.create_mines()
+    if index_regions:
+        board._index_empty_regions()
+    return board
+
+
+def _largest_region_cell(board):
+    """Return row and column of a cell in the biggest empty region."""
+    labels = label_regions(~board.mines & (board.counts == 0))
+    if (labels < 0).all():
+        return divmod(int(np.argmin(board.mines)), board.cells_x)
+    largest = np.bincount(labels[labels >= 0]).argmax()
+    return divmod(int(largest), board.cells_x)
+
+
+def _chord_board(size):
+    """Return a board and an open number with flagged mines around it."""
+    board = _new_board(size)
+    numbers = np.argwhere(~board.mines & (board.counts > 0))
+    row, column = (int(value) for value in numbers[len(numbers) // 2])
+    board.opened[row, column] = True
+    for n_row, n_column in board.neighbours(row, column):
+        if board.mines[n_row, n_column]:
+            board.flagged[n_row, n_column] = True
+    board.count_closed_safe()
+    return board, row, column
+
+
+def _game(size):
+    """Return a started game of the size with the first cell opened."""
+    from minesweeper import Minesweeper
+
+    settings = Settings(*size)
+    # Saved games and replays of the player are left alone.
+    settings.autosave = False
+    settings.record_replays = False
+    game = Minesweeper(settings)
+    game.settings.idle_sleep = False
+    game.stats["state"] = 0
+    game.board.create_mines()
+    game.board.open_cell(*_largest_region_cell(game.board))
+    game._update_screen()
+    return game
+
+
+def _benchmarks(size):
+    """Return benchmarks as name: (setup, run) for a board size."""
+    def full_frame(game):
+        game.board.all_changed = True
+        game._update_screen()
+
+    def flood(board, row, column):
+        board.open_cell(row, column)
+
+    def first_click(board):
+        # Mines are placed and the empty regions indexed with the click.
+        row, column = board.cells_y // 2, board.cells_x // 2
+        board.create_mines(row, column, safe_area=True)
+        board.open_cell(row, column)
+
+    def open_setup(index_regions):
+        def setup():
+            board = _new_board(size, index_regions)
+            return (board,) + _largest_region_cell(board)
+        return setup
+
+    return {
+        "create_board": (lambda: (), lambda: Board(*size)),
+        "create_mines": (lambda: (Board(*size, seed=0),),
+                         lambda board: board.create_mines()),
+        "create_mines_indexed": (
+            lambda: (Board(*size, seed=0, index_regions=True),),
+            lambda board: (board.create_mines(),
+                           board._index_empty_regions())),
+        "flood_reveal": (open_setup(False), flood),
+        "flood_reveal_indexed": (open_setup(True), flood),
+        "first_click": (
+            lambda: (Board(*size, seed=0, index_regions=True),),
+            first_click),
+        "chord": (lambda: _chord_board(size),
+                  lambda board, row, column: board.chord(row, column)),
+        "check_solve": (lambda: (_game(size),),
+                        lambda game: game._check_solve()),
+        "update_screen_full": (lambda: (_game(size),), full_frame),
+        "update_screen_idle": (lambda: (_game(size),),
+                               lambda game: game._update_screen()),
+        "reset_game": (lambda: (_game(size),),
+                       lambda game: game._reset_game()),
+    }
+
+
+def measure(setup, run, min_time=0.2, max_runs=20):
+    """Time run on fresh arguments from setup, return times in ms."""
+    times = []
+    while len(times) < max_runs and sum(times) < min_time * 1000:
+        arguments = setup()
+        start = time.perf_counter()
+        run(*arguments)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_benchmarks(sizes, names=None):
+    """Run benchmarks for sizes, return results by benchmark and size."""
+    results = {}
+    for size_name in sizes:
+        for name, (setup, run) in _benchmarks(SIZES[size_name]).items():
+            if names and name not in names:
+                continue
+            times = measure(setup, run)
+            results.setdefault(name, {})[size_name] = {
+                "median_ms": statistics.median(times),
+                "min_ms": min(times),
+                "runs": len(times),
+            }
+    return results
+
+
+def measure_memory(sizes):
+    """Return memory of indexed boards with mines by size.
+
+    Peak is the most memory used at once while the mines are created.
+    """
+    memory = {}
+    for size_name in sizes:
+        board = Board(*SIZES[size_name], seed=0, index_regions=True)
+        tracemalloc.start()
+        board.create_mines()
+        board._index_empty_regions()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        memory[size_name] = {
+            "bytes_per_cell": board.nbytes / board.mines.size,
+            "board_mb": board.nbytes / 2**20,
+            "create_mines_peak_mb": peak / 2**20,
+        }
+    return memory
+
+
+def compare(results, baseline, tolerance):
+    """Return benchmarks slower than baseline median times tolerance."""
+    regressions = []
+    for name, sizes in results.items():
+        for size_name, result in sizes.items():
+            base = baseline.get(name, {}).get(size_name)
+            if base is None:
+                continue
+            ratio = result["median_ms"] / base["median_ms"]
+            if ratio > tolerance:
+                regressions.append(
+                    f"{name} {size_name}: {base['median_ms']:.3f} ms -> "
+                    f"{result['median_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    """Parse command line arguments, run and compare benchmarks."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark Minesweeper without a display.")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES,
+                        default=list(SIZES))
+    parser.add_argument("--only", nargs="+", metavar="BENCHMARK",
+                        help="run only benchmarks with these names")
+    parser.add_argument("--baseline", help="JSON file to compare with")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                        help="store the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": run_benchmarks(args.sizes, args.only),
+        "memory": measure_memory(args.sizes),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file_object:
+            json.dump(report["results"], file_object, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file_object:
+            baseline = json.load(file_object)
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print("Slower than the baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,537 @@
+"""Module with Board class with the game logic of Minesweeper."""
+
+import random
+from collections import deque
+
+import numpy as np
+
+# Tile codes of cells, as they are shown to the player. Open cells come
+# first, so the tile of an open cell is the number of its neighbouring mines.
+CELL_CLOSED = 9
+CELL_FLAGGED = 10
+MINE_OPEN = 11
+MINE_EXPLODED = 12
+MINE_WRONG = 13
+
+# Neighbour tables by (cells_y, cells_x), shared by all boards of a shape.
+_neighbour_tables = {}
+
+
+def index_dtype(size):
+    """Return the smallest integer type for flat indexes of size cells."""
+    return np.int32 if size < 2**31 else np.int64
+
+
+def neighbour_table(cells_y, cells_x):
+    """Return offsets and flat indexes of neighbours of every cell.
+
+    Neighbours of cell i are indexes[offsets[i]:offsets[i + 1]], row by
+    row. The table is built once for every shape of the board.
+    """
+    table = _neighbour_tables.get((cells_y, cells_x))
+    if table is not None:
+        return table
+
+    # Indexes padded with -1, so shifted windows give every cell a row of
+    # 8 neighbours with -1 outside of the board.
+    size = cells_y * cells_x
+    padded = np.full((cells_y + 2, cells_x + 2), -1, dtype=index_dtype(size))
+    padded[1:-1, 1:-1] = np.arange(size).reshape(cells_y, cells_x)
+    neighbours = np.empty((cells_y, cells_x, 8), dtype=padded.dtype)
+    position = 0
+    for row in range(3):
+        for column in range(3):
+            if row != 1 or column != 1:
+                neighbours[:, :, position] = padded[row:row + cells_y,
+                                                    column:column + cells_x]
+                position += 1
+    neighbours = neighbours.reshape(size, 8)
+    inside = neighbours >= 0
+    offsets = np.zeros(size + 1, dtype=index_dtype(8 * size + 1))
+    np.cumsum(np.count_nonzero(inside, axis=1), out=offsets[1:])
+    table = (offsets, neighbours[inside])
+    _neighbour_tables[(cells_y, cells_x)] = table
+    return table
+
+
+def forget_neighbour_table(cells_y, cells_x):
+    """Drop the table of a shape, boards which use it still keep it."""
+    _neighbour_tables.pop((cells_y, cells_x), None)
+
+
+def neighbour_counts(mask):
+    """Return number of neighbours of every cell that are in the mask.
+
+    Boards are the last two axes, so a stack of boards is counted at once.
+    """
+    # Sum of the padded mask shifted to all 9 positions of a 3x3 window
+    # is a convolution with a 3x3 kernel of ones, without the cell itself.
+    padded = np.pad(mask, [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)])
+    padded = padded.astype(np.int8)
+    rows, columns = mask.shape[-2:]
+    counts = -mask.astype(np.int8)
+    for row in range(3):
+        for column in range(3):
+            counts += padded[..., row:row + rows, column:column + columns]
+    return counts
+
+
+def _row_runs(mask):
+    """Return flat starts and ends of runs of cells of the mask in rows.
+
+    Indexes are of the mask padded with an empty column on both sides, so
+    runs of different rows never touch, and ends are exclusive.
+    """
+    rows, columns = mask.shape
+    padded = np.zeros((rows, columns + 2), dtype=bool)
+    padded[:, 1:-1] = mask
+    padded = padded.ravel()
+    # Runs start and end where the padded mask changes.
+    changes = np.flatnonzero(padded[1:] != padded[:-1]) + 1
+    return changes[0::2], changes[1::2]
+
+
+def _run_roots(starts, ends, width):
+    """Return the first run of the region of every run.
+
+    Runs touch, also diagonally, when they overlap in neighbouring rows
+    with a column more on both sides. Regions are merged with a
+    vectorized union-find of the runs.
+    """
+    # Runs of the next row from the first one ending at or after the
+    # column before the run to the last one starting at or before the
+    # column after it.
+    first_next = np.searchsorted(ends, starts + width)
+    after_last = np.searchsorted(starts, ends + width, side="right")
+    touching = np.maximum(after_last - first_next, 0)
+    first = np.repeat(np.arange(len(starts)), touching)
+    second = (np.arange(len(first)) + np.repeat(
+        first_next - np.cumsum(touching) + touching, touching))
+
+    parent = np.arange(len(starts))
+    while True:
+        # Hook the larger root of every touching pair to the smaller one.
+        first_root = parent[first]
+        second_root = parent[second]
+        different = first_root != second_root
+        if not different.any():
+            return parent
+        np.minimum.at(parent,
+                      np.maximum(first_root, second_root)[different],
+                      np.minimum(first_root, second_root)[different])
+        # Compress paths, so every run points straight to its root.
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def _fill_runs(starts, ends, values, shape, dtype):
+    """Return flat array of the shape with values in runs, -1 elsewhere."""
+    rows, columns = shape
+    # Gaps and runs take turns, from the gap before the first run to the
+    # gap after the last one.
+    bounds = np.concatenate(([0], np.stack((starts, ends), axis=1).ravel(),
+                             [rows * (columns + 2)]))
+    filled = np.full(len(bounds) - 1, -1, dtype=dtype)
+    filled[1::2] = values
+    filled = np.repeat(filled, np.diff(bounds))
+    return filled.reshape(rows, columns + 2)[:, 1:-1].ravel()
+
+
+def label_regions(mask):
+    """Return flat array with the label of every cell's connected region.
+
+    Cells of the mask that touch, also diagonally, get the same label,
+    which is the smallest flat index in their region. Cells outside the
+    mask get -1. Runs of cells in rows are merged, not single cells.
+    """
+    rows, columns = mask.shape
+    starts, ends = _row_runs(mask)
+    roots = _run_roots(starts, ends, columns + 2)
+    # The first run of a region starts at its smallest flat index.
+    row, column = np.divmod(starts[roots], columns + 2)
+    return _fill_runs(starts, ends, row * columns + column - 1, mask.shape,
+                      index_dtype(mask.size))
+
+
+def board_metrics(mines):
+    """Return statistics of boards with masks of mines of the same shape.
+
+    3BV is the smallest number of clicks to clear a board without flags,
+    see analytics.py. 3BV, openings and isolated numbers are arrays with a
+    value for every board and opening sizes have the number of cells for
+    every opening.
+    """
+    boards, rows, columns = mines.shape
+    counts = neighbour_counts(mines)
+    empty = ~mines & (counts == 0)
+    numbers = ~mines & ~empty
+    # Numbers next to an empty cell are opened with its opening.
+    isolated = np.count_nonzero(numbers & (neighbour_counts(empty) == 0),
+                                axis=(1, 2))
+
+    # Boards are stacked with an empty row between them, so regions of
+    # all boards are labelled at once.
+    stacked = np.zeros((boards, rows + 1, columns), dtype=bool)
+    stacked[:, :rows] = empty
+    labels = label_regions(stacked.reshape(-1, columns))
+    size = labels.size
+    roots = labels == np.arange(size)
+    openings = np.count_nonzero(roots.reshape(boards, -1), axis=1)
+
+    # Every number is opened once by each opening around it. Labels
+    # around the numbers are sorted, so repeated ones are next to each
+    # other and only the first of them is counted.
+    stacked_numbers = np.zeros_like(stacked)
+    stacked_numbers[:, :rows] = numbers
+    shape = (boards * (rows + 1), columns)
+    padded = np.pad(labels.reshape(shape), 1, constant_values=-1)
+    cells = np.flatnonzero(stacked_numbers)
+    around = np.sort(np.stack(
+        [padded[row:row + shape[0], column:column + columns].ravel()[cells]
+         for row in range(3) for column in range(3)
+         if row != 1 or column != 1], axis=1), axis=1)
+    first = around >= 0
+    first[:, 1:] &= around[:, 1:] != around[:, :-1]
+    border = around[first]
+    opening_sizes = (np.bincount(labels[labels >= 0], minlength=size)
+                     + np.bincount(border, minlength=size))[roots]
+
+    return {"3bv": openings + isolated, "openings": openings,
+            "opening_size": opening_sizes, "isolated": isolated}
+
+
+def three_bv(mines):
+    """Return 3BV of one board with the mask of its mines."""
+    return int(board_metrics(mines[np.newaxis])["3bv"][0])
+
+
+class Board:
+    """Class to represent the state of the board, without any drawing.
+
+    Cells are kept as columns of NumPy arrays indexed by [row, column]:
+    1 byte each for the mine, opened and flagged masks and the count of
+    neighbouring mines. The index of empty regions adds 4 bytes for the
+    region of every cell and 4 bytes for every cell opened with a region,
+    so a cell takes at most 12 bytes and 1000x1000 boards about 12 MB.
+    The neighbour table takes about 36 bytes a cell more, but it is shared
+    by all boards of the same shape.
+    """
+
+    def __init__(self, cells_x, cells_y, mines, seed=None,
+                 index_regions=False):
+        """Initialize board attributes."""
+        self.cells_x = cells_x
+        self.cells_y = cells_y
+        self.mines_number = mines
+        self.random = random.Random(seed)
+        # Seed of the current mines, None if they were given.
+        self.seed = None
+        self.mines_placed = False
+
+        # Index of empty regions, so a click opens a region all at once.
+        # It is built when the first empty cell of the mines is opened.
+        self.index_regions = index_regions
+        self.region_of = None
+        self.region_offsets = None
+        self.region_cells = None
+
+        # Masks of mines, opened and flagged cells and number of
+        # neighbouring mines for every cell, indexed by [row, column].
+        shape = (cells_y, cells_x)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.opened = np.zeros(shape, dtype=bool)
+        self.flagged = np.zeros(shape, dtype=bool)
+        self.counts = np.zeros(shape, dtype=np.int8)
+
+        # Neighbours of every cell by flat index, see neighbour_table.
+        self.neighbour_offsets, self.neighbour_indexes = neighbour_table(
+            cells_y, cells_x)
+
+        # Row and column of the exploded mine, None while alive.
+        self.exploded = None
+
+        # Number of closed cells without a mine and without a flag, the
+        # board is solved when it reaches 0.
+        self.closed_safe = self.mines.size
+
+        # Flat indexes of cells whose tile may have changed since the last
+        # pop_changed call, single cells and arrays of cells are kept apart.
+        self.all_changed = True
+        self._changed_cells = []
+        self._changed_arrays = []
+
+    @property
+    def nbytes(self):
+        """Return number of bytes taken by arrays of the cells."""
+        arrays = [self.mines, self.opened, self.flagged, self.counts]
+        if self.region_of is not None:
+            arrays += [self.region_of, self.region_offsets, self.region_cells]
+        return sum(array.nbytes for array in arrays)
+
+    def reset(self):
+        """Clear the board state, mines have to be created again."""
+        self.mines.fill(False)
+        self.opened.fill(False)
+        self.flagged.fill(False)
+        self.counts.fill(0)
+        self.exploded = None
+        self.region_of = None
+        self.seed = None
+        self.mines_placed = False
+        self.closed_safe = self.mines.size
+        self.all_changed = True
+
+    def create_mines(self, row=None, column=None, seed=None,
+                     safe_area=False):
+        """Give mines to random cells of a board without mines.
+
+        The cell at row and column never gets a mine, with safe_area its
+        neighbours don't either. Every other cell is equally likely to get
+        one. Only the counts around the mines are updated.
+
+        Every board gets its own seed, which is enough to create the
+        same mines again from the same cell. A new one is drawn if it is
+        not given.
+        """
+        if seed is None:
+            seed = self.random.getrandbits(63)
+        excluded = []
+        if row is not None:
+            excluded.append(row * self.cells_x + column)
+            if safe_area:
+                excluded += self.neighbour_cells(excluded[0]).tolist()
+        if self.mines.size - len(excluded) < self.mines_number:
+            raise ValueError("Too many mines for a safe first cell.")
+
+        cells = np.array(random.Random(seed).sample(
+            range(self.mines.size - len(excluded)), self.mines_number),
+            dtype=np.int64)
+        # Skip excluded cells, so the others keep the same chance.
+        for cell in sorted(excluded):
+            cells[cells >= cell] += 1
+        self._add_mines(cells)
+        self.seed = seed
+
+    def _add_mines(self, cells):
+        """Put mines to cells without mines and count them around."""
+        self.mines.flat[cells] = True
+        rows, columns = np.divmod(cells, self.cells_x)
+        for row_change in (-1, 0, 1):
+            for column_change in (-1, 0, 1):
+                if not row_change and not column_change:
+                    continue
+                n_rows = rows + row_change
+                n_columns = columns + column_change
+                inside = ((0 <= n_rows) & (n_rows < self.cells_y)
+                          & (0 <= n_columns) & (n_columns < self.cells_x))
+                # Mines are different cells, so are their neighbours in
+                # one direction and none of them is added twice.
+                self.counts[n_rows[inside], n_columns[inside]] += 1
+        self.closed_safe -= int(np.count_nonzero(
+            ~self.opened.flat[cells] & ~self.flagged.flat[cells]))
+        self.region_of = None
+        self.mines_placed = True
+
+    def set_mines(self, cells):
+        """Give mines to cells with given flat indexes."""
+        self.mines.fill(False)
+        self.mines.flat[cells] = True
+        self.calculate_counts()
+        self.count_closed_safe()
+        self.seed = None
+        self.mines_placed = True
+
+    def count_closed_safe(self):
+        """Count closed safe cells again from the masks."""
+        self.closed_safe = int(np.count_nonzero(
+            ~self.mines & ~self.opened & ~self.flagged))
+
+    def calculate_counts(self):
+        """Count neighbouring mines of every cell at once."""
+        self.counts[:] = neighbour_counts(self.mines)
+        # Empty regions are indexed again when one is opened.
+        self.region_of = None
+
+    def _index_empty_regions(self):
+        """Find connected empty cells and cells to open with each region."""
+        size = self.mines.size
+        width = self.cells_x + 2
+        dtype = index_dtype(size)
+        starts, ends = _row_runs(~self.mines & (self.counts == 0))
+        roots = _run_roots(starts, ends, width)
+        # Number regions from 0 in order of their first runs.
+        first_runs = roots == np.arange(len(roots))
+        regions = (np.cumsum(first_runs) - 1)[roots]
+        self.region_of = _fill_runs(starts, ends, regions, self.mines.shape,
+                                    dtype)
+
+        # Every region opens its own cells and the numbers around them,
+        # which are the runs with a column more on both sides in the row
+        # and the rows above and below. Columns are without the padding.
+        rows, columns = np.divmod(starts, width)
+        lengths = ends - starts
+        left = np.maximum(columns - 2, 0)
+        right = np.minimum(columns + lengths, self.cells_x)
+        keys = []
+        for row_change in (-1, 0, 1):
+            n_rows = rows + row_change
+            inside = (0 <= n_rows) & (n_rows < self.cells_y)
+            # Keys sort the flat cells of the spans by region, they need 64
+            # bits and are only kept while the index is built.
+            first = (regions[inside].astype(np.int64) * size
+                     + n_rows[inside] * self.cells_x)
+            keys.append(np.stack((first + left[inside],
+                                  first + right[inside]), axis=1))
+        keys = np.concatenate(keys)
+        keys = keys[np.argsort(keys[:, 0])]
+        # Spans overlapping the ones before them in the same region are
+        # merged, so every cell is in one span.
+        new = np.ones(len(keys), dtype=bool)
+        new[1:] = keys[1:, 0] > np.maximum.accumulate(keys[:-1, 1])
+        span_starts = keys[new, 0]
+        span_ends = np.maximum.reduceat(keys[:, 1], np.flatnonzero(new))
+        span_lengths = span_ends - span_starts
+
+        # Cells of region r are region_cells[offsets[r]:offsets[r + 1]].
+        span_offsets = np.concatenate(([0], np.cumsum(span_lengths)))
+        self.region_cells = np.arange(span_offsets[-1], dtype=dtype)
+        self.region_cells += np.repeat(
+            (span_starts % size - span_offsets[:-1]).astype(dtype),
+            span_lengths)
+        self.region_offsets = span_offsets[np.searchsorted(
+            span_starts // size, np.arange(np.count_nonzero(first_runs) + 1))]
+
+    def neighbour_cells(self, cell):
+        """Return flat indexes of neighbours of the cell with flat index."""
+        return self.neighbour_indexes[self.neighbour_offsets[cell]:
+                                      self.neighbour_offsets[cell + 1]]
+
+    def neighbours(self, row, column):
+        """Yield rows and columns of all neighbours of the cell."""
+        for cell in self.neighbour_cells(row * self.cells_x + column).tolist():
+            yield divmod(cell, self.cells_x)
+
+    def open_cell(self, row, column):
+        """Open the cell and cells around it, if it has no mines around."""
+        # Flagged and already opened cells can not be opened.
+        if self.flagged[row, column] or self.opened[row, column]:
+            return
+        self.opened[row, column] = True
+        self._changed_cells.append(row * self.cells_x + column)
+        if self.mines[row, column]:
+            self._explode(row, column)
+            return
+        self.closed_safe -= 1
+        if self.counts[row, column] == 0:
+            self._open_empty(row, column)
+
+    def _open_empty(self, row, column):
+        """Open all the cells connected to the empty cell."""
+        if self.index_regions and self.region_of is None:
+            self._index_empty_regions()
+        if self.region_of is not None:
+            region = self.region_of[row * self.cells_x + column]
+            cells = self.region_cells[self.region_offsets[region]:
+                                      self.region_offsets[region + 1]]
+            # Flags stop the opening, then cells are opened one by one.
+            if not self.flagged.reshape(-1)[cells].any():
+                self.closed_safe -= int(np.count_nonzero(
+                    ~self.opened.reshape(-1)[cells]))
+                self.opened.reshape(-1)[cells] = True
+                self._changed_arrays.append(cells)
+                return
+
+        # Every cell is added to the queue once, when it is opened.
+        opened = self.opened.reshape(-1)
+        flagged = self.flagged.reshape(-1)
+        counts = self.counts.reshape(-1)
+        queue = deque([row * self.cells_x + column])
+        while queue:
+            cell = queue.popleft()
+            if counts[cell] != 0:
+                continue
+            for neighbour in self.neighbour_cells(cell).tolist():
+                if not opened[neighbour] and not flagged[neighbour]:
+                    opened[neighbour] = True
+                    self.closed_safe -= 1
+                    self._changed_cells.append(neighbour)
+                    queue.append(neighbour)
+
+    def _explode(self, row, column):
+        """Stop the game and open all the other mines."""
+        self.exploded = (row, column)
+        self.opened |= self.mines & ~self.flagged
+        # All mines are opened and all flags checked.
+        self._changed_arrays.append(
+            np.flatnonzero(self.mines | self.flagged))
+
+    def flag_cell(self, row, column):
+        """Flag or unflag the closed cell."""
+        if not self.opened[row, column]:
+            self.flagged[row, column] = not self.flagged[row, column]
+            if not self.mines[row, column]:
+                self.closed_safe += -1 if self.flagged[row, column] else 1
+            self._changed_cells.append(row * self.cells_x + column)
+
+    def flag_mines(self):
+        """Flag all the mines."""
+        self._changed_arrays.append(np.flatnonzero(self.mines & ~self.flagged))
+        self.flagged |= self.mines
+
+    def flagged_number(self, row, column):
+        """Return number of flagged cells around the cell."""
+        neighbours = self.neighbour_cells(row * self.cells_x + column)
+        return int(np.count_nonzero(self.flagged.reshape(-1)[neighbours]))
+
+    def chord(self, row, column):
+        """Open all neighbours of the open cell, if its mines are flagged."""
+        if (self.opened[row, column]
+                and self.flagged_number(row, column)
+                == self.counts[row, column]):
+            for cell in self.neighbour_cells(
+                    row * self.cells_x + column).tolist():
+                self.open_cell(*divmod(cell, self.cells_x))
+
+    def is_solved(self):
+        """Return True if there are no closed cells without a mine."""
+        return self.closed_safe == 0
+
+    def pop_changed(self):
+        """Return flat indexes of changed cells and forget them.
+
+        None is returned when every cell has to be drawn again.
+        """
+        if self.all_changed:
+            changed = None
+        else:
+            changed = np.concatenate(
+                self._changed_arrays
+                + [np.array(self._changed_cells, dtype=np.intp)])
+        self.all_changed = False
+        self._changed_cells = []
+        self._changed_arrays = []
+        return changed
+
+    def tiles(self, cells):
+        """Return tile codes of cells with given flat indexes."""
+        mines = self.mines.reshape(-1)[cells]
+        opened = self.opened.reshape(-1)[cells]
+        flagged = self.flagged.reshape(-1)[cells]
+
+        tiles = self.counts.reshape(-1)[cells]
+        tiles[~opened] = CELL_CLOSED
+        tiles[opened & mines] = MINE_OPEN
+        tiles[flagged] = CELL_FLAGGED
+        if self.exploded is not None:
+            # Flags without a mine are shown once the game is lost.
+            tiles[flagged & ~mines] = MINE_WRONG
+            exploded = self.exploded[0] * self.cells_x + self.exploded[1]
+            tiles[cells == exploded] = MINE_EXPLODED
+        return tiles
+
+    def tile(self, row, column):
+        """Return the tile code of the cell."""
+        return int(self.tiles(np.array([row * self.cells_x + column]))[0])
@@ -0,0 +1,111 @@
+"""Module to play or watch games of the game server in the window."""
+
+import json
+import socket
+import threading
+
+import numpy as np
+import pygame
+
+from board import (Board, CELL_CLOSED, CELL_FLAGGED, MINE_EXPLODED,
+                   MINE_OPEN)
+
+# Event with a message from the server, posted by the reading thread
+SERVER_EVENT = pygame.USEREVENT + 1
+
+
+class RemoteBoard(Board):
+    """Class to hold the tiles of a board played on the server.
+
+    Mines are only known where the server shows them. Masks are made
+    from the tiles, so the solver can work on the visible cells.
+    """
+
+    def __init__(self, cells_x, cells_y, mines):
+        """Initialize board attributes."""
+        super().__init__(cells_x, cells_y, mines)
+        self.tile_codes = np.full(cells_x * cells_y, CELL_CLOSED,
+                                  dtype=np.int8)
+
+    def reset(self):
+        """Clear the board, when the server starts a new game."""
+        super().reset()
+        self.tile_codes.fill(CELL_CLOSED)
+
+    def apply(self, cells, tiles):
+        """Change tiles of cells with given flat indexes."""
+        cells = np.array(cells, dtype=np.intp)
+        tiles = np.array(tiles, dtype=np.int8)
+        self.tile_codes[cells] = tiles
+        mines = (tiles == MINE_OPEN) | (tiles == MINE_EXPLODED)
+        self.mines.flat[cells] = mines
+        self.opened.flat[cells] = (tiles < CELL_CLOSED) | mines
+        self.flagged.flat[cells] = tiles == CELL_FLAGGED
+        self.counts.flat[cells] = np.where(tiles < CELL_CLOSED, tiles, 0)
+        self._changed_arrays.append(cells)
+
+    def tiles(self, cells):
+        """Return tile codes of cells with given flat indexes."""
+        return self.tile_codes[cells]
+
+
+class Client:
+    """Class to send moves to the server and receive its messages."""
+
+    def __init__(self, host, port):
+        """Connect to the server."""
+        self.socket = socket.create_connection((host, port))
+        self.file_object = self.socket.makefile("rb")
+        # Id and the first message of the game
+        self.game = None
+        self.info = None
+
+    def start(self, cells_x=8, cells_y=8, mines=10, join=None, watch=None):
+        """Start a new game or join or watch one, return its message."""
+        if join is not None:
+            self._send({"type": "join", "game": join})
+        elif watch is not None:
+            self._send({"type": "watch", "game": watch})
+        else:
+            self._send({"type": "new", "cells_x": cells_x,
+                        "cells_y": cells_y, "mines": mines})
+        message = json.loads(self.file_object.readline() or "null")
+        if message is None or message["type"] != "game":
+            error = message["message"] if message else "connection closed"
+            raise ConnectionError(f"Server refused the game: {error}")
+        self.game = message["game"]
+        self.info = message
+        return message
+
+    def listen(self):
+        """Post messages of the server as events in a background thread."""
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        """Post every message until the connection is closed."""
+        try:
+            for line in self.file_object:
+                pygame.event.post(pygame.event.Event(
+                    SERVER_EVENT, message=json.loads(line)))
+        except (OSError, ValueError):
+            pass
+        pygame.event.post(pygame.event.Event(
+            SERVER_EVENT, message={"type": "closed", "game": self.game}))
+
+    def _send(self, message):
+        """Send one message."""
+        self.socket.sendall(json.dumps(message).encode() + b"\n")
+
+    def move(self, kind, cell=None):
+        """Send a move of the game, cell is a row and a column."""
+        message = {"type": kind, "game": self.game}
+        if cell is not None:
+            message["row"], message["column"] = (int(value) for value in cell)
+        self._send(message)
+
+    def close(self):
+        """Leave the game and close the connection."""
+        try:
+            self.socket.close()
+        except OSError:
+            pass
@@ -0,0 +1,264 @@
+"""Module with environments to play Minesweeper from code, like in gym.
+
+An action is a flat cell index to open it or the cell index plus the
+number of cells to flag or unflag it. An observation holds the tile codes
+of board.py for every cell. Mines are placed with the first opened cell,
+like in the game. A step gives reward 1 for a won game, -1 for an opened
+mine and 0 otherwise.
+
+Unlike in the game, flags don't count towards a win, so a game can not be
+won by flagging every cell: all cells without a mine have to be opened.
+
+Example: python env.py --boards 1000 --steps 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from board import (Board, CELL_CLOSED, CELL_FLAGGED, MINE_EXPLODED,
+                   neighbour_counts)
+
+
+class MinesweeperEnv:
+    """Class to play one board step by step."""
+
+    def __init__(self, cells_x=8, cells_y=8, mines=10, seed=None):
+        """Initialize environment attributes."""
+        self.board = Board(cells_x, cells_y, mines, seed=seed)
+        self.size = cells_x * cells_y
+        self.cells = np.arange(self.size)
+        self.done = False
+
+    def reset(self):
+        """Start a new game and return its observation."""
+        self.board.reset()
+        self.done = False
+        return self.observation()
+
+    def observation(self):
+        """Return tile codes of the board."""
+        return self.board.tiles(self.cells).reshape(self.board.mines.shape)
+
+    def step(self, action):
+        """Do the action, return observation, reward, done and info."""
+        if self.done:
+            raise RuntimeError("The game is over, reset the environment.")
+        board = self.board
+        row, column = divmod(action % self.size, board.cells_x)
+        if action >= self.size:
+            board.flag_cell(row, column)
+        else:
+            if not board.mines_placed:
+                board.create_mines(row, column)
+            board.open_cell(row, column)
+        # Changes are only kept for drawing.
+        board.pop_changed()
+
+        lost = board.exploded is not None
+        # Closed safe cells of the board don't include flagged ones.
+        won = (not lost and board.closed_safe == 0
+               and not (board.flagged & ~board.mines).any())
+        self.done = won or lost
+        reward = 1.0 if won else -1.0 if lost else 0.0
+        return self.observation(), reward, self.done, {"won": won}
+
+
+def _grow(mask):
+    """Return stack of masks with neighbours of their cells added."""
+    # A 3x3 window is a window over rows and then over columns.
+    rows = mask.copy()
+    rows[:, 1:] |= mask[:, :-1]
+    rows[:, :-1] |= mask[:, 1:]
+    grown = rows.copy()
+    grown[:, :, 1:] |= rows[:, :, :-1]
+    grown[:, :, :-1] |= rows[:, :, 1:]
+    return grown
+
+
+class BatchEnv:
+    """Class to play many boards of the same size in lockstep.
+
+    Boards are stacked in NumPy arrays of shape (boards, cells_y,
+    cells_x) and every step does one action on each of them at once.
+    Finished boards start a new game in the same step, unless autoreset
+    is turned off, then their actions are ignored until reset.
+    """
+
+    def __init__(self, boards, cells_x=8, cells_y=8, mines=10, seed=None,
+                 autoreset=True):
+        """Initialize environment attributes."""
+        if mines >= cells_x * cells_y:
+            raise ValueError("Too many mines for a safe first cell.")
+        self.boards = boards
+        self.cells_x = cells_x
+        self.cells_y = cells_y
+        self.size = cells_x * cells_y
+        self.mines_number = mines
+        self.autoreset = autoreset
+        self.random = np.random.default_rng(seed)
+
+        shape = (boards, cells_y, cells_x)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.opened = np.zeros(shape, dtype=bool)
+        self.flagged = np.zeros(shape, dtype=bool)
+        self.counts = np.zeros(shape, dtype=np.int8)
+        # Boards with mines, closed cells without a mine and finished games
+        self.placed = np.zeros(boards, dtype=bool)
+        self.closed_safe = np.full(boards, self.size - mines)
+        self.done = np.zeros(boards, dtype=bool)
+        self.indexes = np.arange(boards)
+
+    def reset(self):
+        """Start new games on all boards and return their observations."""
+        self._reset_boards(self.indexes)
+        return self.observation()
+
+    def _reset_boards(self, boards):
+        """Clear the boards with given indexes."""
+        self.mines[boards] = False
+        self.opened[boards] = False
+        self.flagged[boards] = False
+        self.counts[boards] = 0
+        self.placed[boards] = False
+        self.closed_safe[boards] = self.size - self.mines_number
+        self.done[boards] = False
+
+    def observation(self):
+        """Return tile codes of all boards."""
+        tiles = np.where(self.opened, self.counts, np.int8(CELL_CLOSED))
+        tiles[self.flagged] = CELL_FLAGGED
+        tiles[self.opened & self.mines] = MINE_EXPLODED
+        return tiles
+
+    def step(self, actions):
+        """Do an action on every board.
+
+        Return observations, rewards, done and info with won and lost
+        masks. Observations of boards that were reset show the new game.
+        """
+        actions = np.asarray(actions)
+        flag = actions >= self.size
+        cells = actions - flag * self.size
+        active = ~self.done
+        mines = self.mines.reshape(self.boards, -1)
+        opened = self.opened.reshape(self.boards, -1)
+        flagged = self.flagged.reshape(self.boards, -1)
+
+        # Flag or unflag closed cells.
+        boards = self.indexes[flag & active]
+        flag_cells = cells[boards]
+        closed = ~opened[boards, flag_cells]
+        flagged[boards[closed], flag_cells[closed]] ^= True
+
+        # Open closed cells without a flag.
+        boards = self.indexes[~flag & active]
+        open_cells = cells[boards]
+        can_open = (~opened[boards, open_cells]
+                    & ~flagged[boards, open_cells])
+        boards = boards[can_open]
+        open_cells = open_cells[can_open]
+        first = ~self.placed[boards]
+        if first.any():
+            self._place_mines(boards[first], open_cells[first])
+        opened[boards, open_cells] = True
+
+        lost = np.zeros(self.boards, dtype=bool)
+        hit = mines[boards, open_cells]
+        lost[boards[hit]] = True
+        boards = boards[~hit]
+        open_cells = open_cells[~hit]
+        self.closed_safe[boards] -= 1
+        empty = self.counts.reshape(self.boards, -1)[boards, open_cells] == 0
+        if empty.any():
+            self._open_empty(boards[empty], open_cells[empty])
+
+        won = active & ~lost & (self.closed_safe == 0)
+        self.done |= won | lost
+        rewards = won.astype(np.float32) - lost
+        done = self.done.copy()
+        if self.autoreset and done.any():
+            self._reset_boards(self.indexes[done])
+        return (self.observation(), rewards, done,
+                {"won": won, "lost": lost})
+
+    def _place_mines(self, boards, cells):
+        """Give mines to boards, never to the cell opened first."""
+        count = len(boards)
+        mines = np.zeros((count, self.size), dtype=bool)
+        if self.mines_number:
+            # Cells with the smallest random keys get the mines, so every
+            # other cell is equally likely to get one.
+            keys = self.random.random((count, self.size))
+            keys[np.arange(count), cells] = 2
+            chosen = np.argpartition(keys, self.mines_number - 1,
+                                     axis=1)[:, :self.mines_number]
+            mines[np.arange(count)[:, None], chosen] = True
+        mines = mines.reshape(count, self.cells_y, self.cells_x)
+        self.mines[boards] = mines
+        self.counts[boards] = neighbour_counts(mines)
+        self.placed[boards] = True
+
+    def _open_empty(self, boards, cells):
+        """Open all the cells connected to the opened empty cells."""
+        count = len(boards)
+        opened = self.opened[boards]
+        flagged = self.flagged[boards]
+        empty = self.counts[boards] == 0
+        before = np.count_nonzero(opened, axis=(1, 2))
+
+        # Empty cells open their neighbours, which can't be mines, until
+        # no new empty cell is opened. Flags stop the opening.
+        frontier = np.zeros_like(opened)
+        frontier.reshape(count, -1)[np.arange(count), cells] = True
+        while frontier.any():
+            grown = _grow(frontier) & ~opened & ~flagged
+            opened |= grown
+            frontier = grown & empty
+        self.opened[boards] = opened
+        self.closed_safe[boards] -= (np.count_nonzero(opened, axis=(1, 2))
+                                     - before)
+
+
+def random_actions(env, random):
+    """Return actions opening a random closed cell on every board."""
+    keys = random.random((env.boards, env.size))
+    keys[(env.opened | env.flagged).reshape(env.boards, -1)] = 2
+    return keys.argmin(axis=1)
+
+
+def main():
+    """Step boards with random actions and print the throughput."""
+    parser = argparse.ArgumentParser(
+        description="Time the batch environment with random actions.")
+    parser.add_argument("--boards", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--cells-x", type=int, default=8)
+    parser.add_argument("--cells-y", type=int, default=8)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = BatchEnv(args.boards, args.cells_x, args.cells_y, args.mines,
+                   args.seed)
+    random = np.random.default_rng(args.seed)
+    env.reset()
+    actions = random_actions(env, random)
+    duration = 0
+    won = lost = 0
+    for _ in range(args.steps):
+        start = time.perf_counter()
+        _, _, _, info = env.step(actions)
+        duration += time.perf_counter() - start
+        won += int(np.count_nonzero(info["won"]))
+        lost += int(np.count_nonzero(info["lost"]))
+        # Actions are chosen outside of the timing.
+        actions = random_actions(env, random)
+    steps = args.boards * args.steps
+    print(f"{steps} steps on {args.boards} boards, {won} won, {lost} lost")
+    print(f"Steps per second: {steps / duration:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Module to generate boards that can be solved without guessing."""
+
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+
+import numpy as np
+
+from board import Board
+from solver import Solver
+
+
+def generate_no_guess(cells_x, cells_y, mines, seed=None):
+    """Generate mines which the solver clears from the start cell.
+
+    Return flat indexes of mines and the flat index of the start cell,
+    which has no mines around it.
+    """
+    generator_random = random.Random(seed)
+    board = Board(cells_x, cells_y, mines)
+    while True:
+        # The start cell and its neighbours never have a mine.
+        start = generator_random.randrange(cells_x * cells_y)
+        row, column = divmod(start, cells_x)
+        board.reset()
+        board.create_mines(row, column, generator_random.getrandbits(63),
+                           safe_area=True)
+        mine_cells = np.flatnonzero(board.mines)
+        if _is_solvable(board, row, column):
+            return mine_cells, start
+
+
+def _is_solvable(board, row, column):
+    """Return True if the solver clears the board from the cell."""
+    solver = Solver(board)
+    board.open_cell(row, column)
+    while not board.is_solved():
+        solver.solve()
+        if not solver.safe_cells and not solver.mine_cells:
+            return False
+        for cell in solver.safe_cells:
+            board.open_cell(*divmod(cell, board.cells_x))
+        for cell in solver.mine_cells:
+            board.flag_cell(*divmod(cell, board.cells_x))
+    return True
+
+
+class BoardPool:
+    """Class to keep boards without guessing ready for new games.
+
+    Worker processes generate boards in the background, a few for every
+    (cells_x, cells_y, mines) that was asked for.
+    """
+
+    def __init__(self, boards=4, workers=1):
+        """Initialize pool attributes."""
+        self.boards = boards
+        # Spawned workers don't share pygame state with the game.
+        self.executor = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {}
+
+    def fill(self, cells_x, cells_y, mines):
+        """Start generating boards for the size and number of mines."""
+        futures = self.futures.setdefault((cells_x, cells_y, mines), [])
+        while len(futures) < self.boards:
+            futures.append(self.executor.submit(
+                generate_no_guess, cells_x, cells_y, mines,
+                random.getrandbits(64)))
+
+    def get(self, cells_x, cells_y, mines):
+        """Return mines and start cell of a board, see generate_no_guess.
+
+        A generated board is returned at once and a new one is started in
+        its place. Only an empty pool waits for the first board.
+        """
+        self.fill(cells_x, cells_y, mines)
+        futures = self.futures[(cells_x, cells_y, mines)]
+        done = [future for future in futures if future.done()]
+        if not done:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        future = next(iter(done))
+        futures.remove(future)
+        self.fill(cells_x, cells_y, mines)
+        return future.result()
+
+    def close(self):
+        """Stop the workers and drop boards that are not ready."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
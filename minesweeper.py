@@ -1,42 +1,90 @@
 """The main file with all the logic for Minesweeper"""
 
+import time
+
+# Start of the imports, the startup report counts from here.
+IMPORT_START = time.perf_counter()
+
+import argparse
 import os
-import random
+import struct
 import sys
 
 import pygame
 
+from atlas import get_atlas
+from board import Board
 from button import Button
-from cell import Cell
+from client import SERVER_EVENT, Client, RemoteBoard
+from profiler import Profiler
+from renderer import Renderer
+from replay import CHORD, FLAG, OPEN, Recorder
 from scoreboard import Scoreboard
 from settings import Settings
+from snapshot import Snapshot, SnapshotWriter, load
+from solver import Solver
+from viewport import Viewport
+
+# Event posted every second while the game is running
+TIME_EVENT = pygame.USEREVENT
+# Event with the 3BV of a won game, posted when its result is saved
+RESULT_EVENT = pygame.USEREVENT + 2
 
 
 class Minesweeper:
     """Class to handle running the game."""
 
-    def __init__(self):
-        """Initialize pygame and game resources."""
-        pygame.init()
-        self.settings = Settings()
+    def __init__(self, settings=None, client=None):
+        """Initialize pygame and game resources.
+
+        With a client of the game server, moves are sent to the server and
+        the board shows the cells it sends back.
+        """
+        # Durations of startup phases in seconds, for --profile-startup
+        self.startup_times = {}
+        self._phase_start = IMPORT_START
+        self._end_phase("import")
+
+        # Only the display is needed, audio and joysticks are not used
+        # and fonts are loaded when text is first shown.
+        pygame.display.init()
+        self.settings = settings if settings is not None else Settings()
+        self.client = client
         self.screen = pygame.display.set_mode(
             (self.settings.screen_width, self.settings.screen_height))
         self.my_path = os.path.dirname(os.path.realpath(__file__))
-        pygame.display.set_caption("Minesweeper")
+        pygame.display.set_caption(
+            "Minesweeper" if client is None
+            else f"Minesweeper - game {client.game}")
+        self._end_phase("init")
+
+        # Load all images once, they are shared by all game elements.
+        self.atlas = get_atlas(self.my_path, self.settings.scale)
+        self._end_phase("assets")
 
         self.clock = pygame.time.Clock()
 
+        # Mouse motion is not used, so it does not wake up the game.
+        if self.settings.idle_sleep:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+        # Held keys keep scrolling the board.
+        pygame.key.set_repeat(200, 1000 // self.settings.game_framerate)
+
         # Dictionary to hold stats
         self.stats = {
             "state": 2,  # 0 means playing, -1 is dead, 1 solved, 2 start
             "mines_left": self.settings.mines,
             "time": 0,
-            "time_float": 0
+            "start_time": 0
         }
 
-        # Filename of the results file
-        self.filename = "results.txt"
-        self.file_dir = os.path.join(self.my_path, self.filename)
+        # Results are kept in a database, opened when it is first needed.
+        self._results = None
+
+        # Games are recorded, so they can be played again.
+        self.recorder = None
+        if self.settings.record_replays:
+            self.recorder = Recorder(os.path.join(self.my_path, "replays.bin"))
 
         # Create the button
         self.emoji_button = Button(self)
@@ -44,14 +92,93 @@ class Minesweeper:
         # Create scoreboard instance
         self.scoreboard = Scoreboard(self)
 
-        # Create cells and mines.
-        self.cells = []
-        self._create_grid()
+        # Boards without guessing are prepared in the background.
+        self.board_pool = None
+        if self.settings.no_guess:
+            from generator import BoardPool
+            self.board_pool = BoardPool(self.settings.board_pool_size,
+                                        self.settings.board_pool_workers)
+
+        # Create the board with the game state and mines.
+        if client is not None:
+            self.board = RemoteBoard(self.settings.cells_x,
+                                     self.settings.cells_y,
+                                     self.settings.mines)
+        else:
+            self.board = Board(self.settings.cells_x, self.settings.cells_y,
+                               self.settings.mines,
+                               index_regions=self.settings.index_regions)
         self._create_mines()
-        self._calculate_all_neighbours()
+
+        # Create solver for hints and mine probabilities.
+        self.solver = Solver(self.board, self.settings.solver_max_cells)
+
+        # Create viewport with the visible part of the board.
+        self.viewport = Viewport(self)
+
+        # Create renderer to draw the changes on the screen.
+        self.renderer = Renderer(self)
+        self._end_phase("grid")
+
+        # Timings of frames, only if they are profiled.
+        self.profiler = Profiler() if self.settings.profile else None
+        self.show_profile = False
+
+        # The game in progress is saved on quit and resumed at start. A
+        # saved game of other board settings is kept until this game saves.
+        self.snapshots = None
+        self.owns_save = False
+        if self.settings.autosave:
+            save_path = os.path.join(self.my_path, "save.bin")
+            self.snapshots = SnapshotWriter(save_path)
+            if os.path.exists(save_path):
+                self._resume(save_path)
+
+        # Messages of the server are read in the background.
+        if client is not None:
+            self._set_remote_state(client.info["state"],
+                                   client.info["mines_left"],
+                                   client.info["elapsed"])
+            client.listen()
+        self._end_phase("resources")
+
+    def _end_phase(self, name):
+        """Save the duration of a startup phase, which ends now."""
+        now = time.perf_counter()
+        self.startup_times[name] = now - self._phase_start
+        self._phase_start = now
+
+    def _report_startup(self):
+        """Print durations of the startup phases and quit."""
+        for name, seconds in self.startup_times.items():
+            print(f"{name:12} {seconds * 1000:7.1f} ms")
+        total = sum(self.startup_times.values())
+        print(f"{'first frame':12} {total * 1000:7.1f} ms")
+        self._quit()
+
+    @property
+    def results(self):
+        """Return the results store, it is opened when first needed.
+
+        Results of the old results.txt file are imported into it once.
+        """
+        if self._results is None:
+            from results import ResultsStore
+            self._results = ResultsStore(
+                os.path.join(self.my_path, "results.db"))
+            self._results.import_text(
+                os.path.join(self.my_path, "results.txt"))
+        return self._results
 
     def run_game(self):
         """Function with main game loop."""
+        # The first frame is drawn without waiting for events.
+        self._update_screen()
+        self._end_phase("frame")
+        if self.settings.profile_startup:
+            self._report_startup()
+        if self.profiler is not None:
+            self._run_profiled()
         # Main game loop
         while True:
             self._check_events()
@@ -59,260 +186,425 @@ class Minesweeper:
             self._update_screen()
             self._update_time()
 
+    def _run_profiled(self):
+        """Main game loop which times every phase of a frame."""
+        profiler = self.profiler
+        while True:
+            profiler.start_frame()
+            events = self._get_events()
+            profiler.mark("wait")
+            self._check_events(events)
+            profiler.mark("events")
+            self._check_solve()
+            profiler.mark("solve")
+            if self.show_profile:
+                self._update_profile()
+            self._update_screen()
+            profiler.mark("screen")
+            self._update_time()
+            profiler.mark("time")
+            profiler.end_frame()
+
+    def _update_profile(self):
+        """Give the renderer a new profiler overlay once a second."""
+        image = self.profiler.overlay(self.settings.scale)
+        if image is not None:
+            self.renderer.profile_image = image
+            self.renderer.profile_changed = True
+
     def _check_solve(self):
         """Check if all empty cells are open and respond."""
-        # Check if all empty cells are open.
-        all_open = True
-        for row in self.cells:
-            for cell in row:
-                if cell.status != -1 and cell.state == 1:
-                    all_open = False
         # If they are, change state to solved and flag all other mines.
-        if all_open and self.stats["state"] != 1:
+        if self.board.is_solved() and self.stats["state"] != 1:
             # Change state to solved.
             self.stats["state"] = 1
             self.emoji_button.current_emoji = 2
+            pygame.time.set_timer(TIME_EVENT, 0)
             # Flag all non flagged mines.
-            for row in self.cells:
-                for cell in row:
-                    # Flag all mine cells if not already
-                    if cell.status == -1 and cell.state != -1:
-                        cell.state = -1
-            # Save result and settings to file: results.txt
-            cells_x = self.settings.cells_x
-            cells_y = self.settings.cells_y
-            mines = self.settings.mines
-            time = self.stats["time"]
-
-            results_text = f"{cells_x}x{cells_y}: {time} s ({mines} mines)\n"
-            with open(self.file_dir, "a") as file_object:
-                file_object.write(results_text)
-
-    def _check_events(self):
+            self.board.flag_mines()
+            if self.recorder is not None:
+                self.recorder.end(True)
+            self._remove_save()
+            # Show the leaderboard with the new result and save it.
+            seconds = round(time.monotonic() - self.stats["start_time"], 3)
+            if self.settings.save_results:
+                self._show_leaderboard(seconds)
+                lines = self.renderer.leaderboard
+                # 3BV of a big board takes a while, the writer counts it.
+                self.results.add(
+                    self.settings.cells_x, self.settings.cells_y,
+                    self.settings.mines, seconds, self.board.seed,
+                    mines_mask=self.board.mines.copy(),
+                    saved=lambda bbbv: pygame.event.post(pygame.event.Event(
+                        RESULT_EVENT, lines=lines, seconds=seconds,
+                        bbbv=bbbv)))
+
+    def _get_events(self):
+        """Wait for the next frame and return new events."""
+        # Sleep until something happens, if the game doesn't run at a
+        # fixed framerate.
+        if self.settings.idle_sleep:
+            return [pygame.event.wait()] + pygame.event.get()
+        self.clock.tick(self.settings.game_framerate)
+        return pygame.event.get()
+
+    def _check_events(self, events=None):
         """Check for events and respond to them."""
-        for event in pygame.event.get():
+        if events is None:
+            events = self._get_events()
+
+        for event in events:
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit()
+            elif event.type == pygame.WINDOWEXPOSED:
+                # Draw everything again after the window was covered.
+                self.board.all_changed = True
+            elif event.type == SERVER_EVENT:
+                self._check_message(event.message)
+            elif event.type == RESULT_EVENT:
+                self._show_speed(event.lines, event.seconds, event.bbbv)
+            elif event.type == pygame.MOUSEWHEEL:
+                self._check_mouse_wheel(event)
+            elif event.type == pygame.KEYDOWN:
+                self._check_keydown(event)
+            elif event.type in (pygame.MOUSEBUTTONDOWN,
+                                pygame.MOUSEBUTTONUP) and event.button > 3:
+                # Wheel is handled by its own events.
+                continue
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = event.pos
                 if self.emoji_button.current_emoji != 2:
                     self.emoji_button.current_emoji *= -1
                 if event.button == 3:
-                    if self.stats["state"] == 0:
-                        self._check_right_mouse(mouse_pos)
+                    self._check_right_mouse(mouse_pos)
             elif event.type == pygame.MOUSEBUTTONUP:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = event.pos
                 if self.emoji_button.current_emoji != 2:
                     self.emoji_button.current_emoji *= -1
                 if event.button == 1:
                     self._check_left_mouse(mouse_pos)
                 elif event.button == 2:
-                    if self.stats["state"] == 0:
-                        self._check_middle_mouse(mouse_pos)
+                    self._check_middle_mouse(mouse_pos)
+
+    def _quit(self):
+        """Save everything and close the game."""
+        if self.snapshots is not None:
+            if self.stats["state"] == 0:
+                self._save_game()
+            else:
+                self._remove_save()
+            self.snapshots.close()
+        if self.board_pool is not None:
+            self.board_pool.close()
+        if self._results is not None:
+            self._results.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.client is not None:
+            self.client.close()
+        if self.profiler is not None:
+            self.profiler.dump(
+                os.path.join(self.my_path, "profile.json"),
+                os.path.join(self.my_path, "profile_trace.json"))
+        sys.exit()
+
+    def _check_message(self, message):
+        """Respond to a message of the game server."""
+        if message["type"] == "delta":
+            self.board.apply(message["cells"], message["tiles"])
+            self._set_remote_state(message["state"], message["mines_left"])
+        elif message["type"] == "reset":
+            self._reset_game()
+        elif message["type"] == "closed":
+            self._quit()
+        elif message["type"] == "error":
+            print(message["message"], file=sys.stderr)
+
+    def _set_remote_state(self, state, mines_left, elapsed=0):
+        """Show the state of the game on the server."""
+        if state != self.stats["state"]:
+            if state == 0:
+                # Start the clock, elapsed is given for a game in progress.
+                self.stats["start_time"] = time.monotonic() - elapsed
+                pygame.time.set_timer(TIME_EVENT, 1000)
+            else:
+                pygame.time.set_timer(TIME_EVENT, 0)
+            if state == 1:
+                self.emoji_button.current_emoji = 2
+            elif state == -1:
+                self.emoji_button.current_emoji = 0
+            self.stats["state"] = state
+        if mines_left != self.stats["mines_left"]:
+            self.stats["mines_left"] = mines_left
+            self.scoreboard.prep_mines()
+
+    def _snapshot(self):
+        """Return snapshot of the game in progress."""
+        elapsed = time.monotonic() - self.stats["start_time"]
+        return Snapshot.from_game(self.board, self.stats, elapsed)
+
+    def _save_game(self):
+        """Save the game in progress in the background."""
+        self.snapshots.checkpoint(self._snapshot())
+        self.owns_save = True
+
+    def _remove_save(self):
+        """Remove the saved game, if this game resumed or saved it."""
+        if self.snapshots is not None and self.owns_save:
+            self.snapshots.remove()
+            self.owns_save = False
+
+    def _resume(self, path):
+        """Continue the saved game, if it has the same board settings."""
+        try:
+            snapshot = load(path)
+        except (OSError, ValueError, struct.error):
+            return
+        if ((snapshot.cells_x, snapshot.cells_y, snapshot.mines)
+                != (self.settings.cells_x, self.settings.cells_y,
+                    self.settings.mines) or snapshot.state != 0):
+            return
+        snapshot.restore(self.board)
+        self.owns_save = True
+        # Moves before the save are not recorded, so neither is the rest.
+        if self.recorder is not None:
+            self.recorder.stop()
+
+        self.stats["state"] = 0
+        self.stats["mines_left"] = snapshot.mines_left
+        self.stats["time"] = int(snapshot.elapsed)
+        self.stats["start_time"] = time.monotonic() - snapshot.elapsed
+        pygame.time.set_timer(TIME_EVENT, 1000)
+        self.scoreboard.prep_time()
+        self.scoreboard.prep_mines()
+
+    def _check_mouse_wheel(self, event):
+        """Scroll the board with the wheel or zoom it with ctrl held."""
+        if pygame.key.get_mods() & pygame.KMOD_CTRL:
+            self.viewport.zoom(event.y, pygame.mouse.get_pos())
+            return
+        step = self.settings.pan_cells * self.viewport.cell_size
+        x_change, y_change = -event.x, -event.y
+        # Shift turns vertical scrolling into horizontal.
+        if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+            x_change, y_change = y_change, x_change
+        self.viewport.pan(x_change * step, y_change * step)
+
+    def _check_keydown(self, event):
+        """Respond to scrolling, zooming and solver keys."""
+        step = self.settings.pan_cells * self.viewport.cell_size
+        if event.key == pygame.K_LEFT:
+            self.viewport.pan(-step, 0)
+        elif event.key == pygame.K_RIGHT:
+            self.viewport.pan(step, 0)
+        elif event.key == pygame.K_UP:
+            self.viewport.pan(0, -step)
+        elif event.key == pygame.K_DOWN:
+            self.viewport.pan(0, step)
+        elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.viewport.zoom(1)
+        elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.viewport.zoom(-1)
+        elif event.key == pygame.K_h and self.stats["state"] in (0, 2):
+            self._show_hint()
+        elif event.key == pygame.K_p:
+            # Show or hide mine probabilities.
+            self.renderer.show_probabilities = (
+                not self.renderer.show_probabilities)
+            self.renderer.overlay_changed = True
+        elif event.key == pygame.K_F3 and self.profiler is not None:
+            # Show or hide frame timings.
+            self.show_profile = not self.show_profile
+            self.profiler.overlay_time = 0
+            if not self.show_profile:
+                self.renderer.profile_image = None
+                self.renderer.profile_changed = True
+        elif event.key == pygame.K_l:
+            # Show or hide the best times.
+            if self.renderer.leaderboard is None:
+                self._show_leaderboard()
+            else:
+                self.renderer.leaderboard = None
+                self.renderer.overlay_changed = True
+
+    def _show_leaderboard(self, seconds=None):
+        """Show best times for the board, with the new time if given."""
+        board = (self.settings.cells_x, self.settings.cells_y,
+                 self.settings.mines)
+        times = [best for best, _, _ in self.results.best_times(*board, 10)]
+        lines = [f"Best times {board[0]}x{board[1]} ({board[2]} mines)"]
+        if seconds is not None:
+            # The new time is not saved yet, so it is added here.
+            better = self.results.percentile_of(*board, seconds)
+            lines.append(f"{seconds:.2f} s, better than {better:.0f} %")
+            times = sorted(times + [seconds])[:10]
+        if not times:
+            lines.append("No results yet")
+        for place, best in enumerate(times, 1):
+            lines.append(f"{place}. {best:.2f} s")
+        median = self.results.time_at_percentile(*board, 50)
+        if median is not None:
+            lines.append(f"Median {median:.2f} s")
+        self.renderer.leaderboard = lines
+        self.renderer.overlay_changed = True
+
+    def _show_speed(self, lines, seconds, bbbv):
+        """Add 3BV/s below the new time on the leaderboard with lines."""
+        # The leaderboard of the won game may be hidden by now.
+        if self.renderer.leaderboard is not lines or not seconds:
+            return
+        lines.insert(2, f"3BV {bbbv}, {bbbv / seconds:.2f} 3BV/s")
+        self.renderer.overlay_changed = True
+
+    def _show_hint(self):
+        """Mark a safe cell or the cell least likely to have a mine."""
+        hint = self.solver.hint()
+        if hint is not None:
+            self.renderer.hint = hint[0] * self.settings.cells_x + hint[1]
+            self.renderer.overlay_changed = True
 
     def _check_left_mouse(self, mouse_pos):
         """Check for left mouse button presses and respond to them."""
-        # Check if one of the cells is clicked.
-        if self.stats["state"] == 0:
-            for row in self.cells:
-                for cell in row:
-                    cell_clicked = cell.rect.collidepoint(mouse_pos)
-                    # Open the selected cell.
-                    if cell_clicked and cell.state == 1:
-                        cell.open_cell(self.cells, self)
-
-        # Check if one of the cells is clicked at the beginning.
-        if self.stats["state"] == 2:
-            self.stats["state"] = 0
-            for row in self.cells:
-                for cell in row:
-                    cell_clicked = cell.rect.collidepoint(mouse_pos)
-                    # Check if cell has a mine and move it
-                    if cell_clicked and cell.status == -1:
-                        self._move_mine(cell)
-
-                    # Open the selected cell.
-                    if cell_clicked and cell.state == 1:
-                        cell.open_cell(self.cells, self)
+        cell = self.viewport.cell_at(mouse_pos)
+        if cell is not None:
+            self._open_cell(cell)
 
         # Check if the emoji button is clicked.
         if self.emoji_button.rect.collidepoint(mouse_pos):
-            self._reset_game()
+            if self.client is not None:
+                # The server resets the game for all its players.
+                self.client.move("reset")
+            else:
+                self._reset_game()
 
     def _check_middle_mouse(self, mouse_pos):
         """check for middle mouse button presses and respond to them."""
-        for row in self.cells:
-            for cell in row:
-                cell_clicked = cell.rect.collidepoint(mouse_pos)
-                # Check if cell is already opened.
-                # Only chord if cell.flagged_number == cell.status
-                if (cell_clicked and cell.state == 0
-                        and cell.flagged_number == cell.status):
-                    # Open all the cells around the original one.
-                    cell_x = []
-                    cell_y = []
-
-                    # Go through all neighbour's coordinates
-                    # and only use good ones.
-                    for p_value in range(cell.column - 1, cell.column + 2):
-                        if 0 <= p_value < self.settings.cells_x:
-                            cell_x.append(p_value)
-                    for q_value in range(cell.row - 1, cell.row + 2):
-                        if 0 <= q_value < self.settings.cells_y:
-                            cell_y.append(q_value)
-
-                    # Open surrounding cells.
-                    for x_value in cell_x:
-                        for y_value in cell_y:
-                            if x_value != cell.column or y_value != cell.row:
-                                self.cells[y_value][x_value].open_cell(
-                                    self.cells, self)
+        cell = self.viewport.cell_at(mouse_pos)
+        if cell is not None:
+            self._chord_cell(cell)
 
     def _check_right_mouse(self, mouse_pos):
         """Check for right mouse button presses and respond to them."""
-        for row in self.cells:
-            for cell in row:
-                cell_clicked = cell.rect.collidepoint(mouse_pos)
-                # Only flag closed cells.
-                if cell_clicked and cell.state != 0:
-                    if cell.state == 1:
-                        self.stats["mines_left"] -= 1
-                    elif cell.state == -1:
-                        self.stats["mines_left"] += 1
-                    cell.flag_cell(self.cells)
-                    # Update mines left image.
-                    self.scoreboard.prep_mines()
+        cell = self.viewport.cell_at(mouse_pos)
+        if cell is not None:
+            self._flag_cell(cell)
+
+    def _open_cell(self, cell):
+        """Open the cell, the first one starts the game."""
+        if self.client is not None:
+            self.client.move("open", cell)
+            return
+        # Check if one of the cells is clicked at the beginning.
+        if self.stats["state"] == 2:
+            self.stats["state"] = 0
+            # Start the clock.
+            self.stats["start_time"] = time.monotonic()
+            pygame.time.set_timer(TIME_EVENT, 1000)
+            # Place mines away from the cell, boards without guessing
+            # already have them and are solved from their start cell.
+            if not self.board.mines_placed:
+                self.board.create_mines(
+                    *cell, safe_area=self.settings.safe_first_area)
+                if self.recorder is not None:
+                    self.recorder.start(
+                        self.settings.cells_x, self.settings.cells_y,
+                        self.settings.mines, self.board.seed,
+                        safe_area=self.settings.safe_first_area)
+
+        # Open the selected cell.
+        if self.stats["state"] == 0:
+            self._record(OPEN, cell)
+            self.board.open_cell(*cell)
+            self._check_explosion()
+
+    def _chord_cell(self, cell):
+        """Open all the cells around the cell."""
+        if self.client is not None:
+            self.client.move("chord", cell)
+        elif self.stats["state"] == 0:
+            self._record(CHORD, cell)
+            self.board.chord(*cell)
+            self._check_explosion()
+
+    def _flag_cell(self, cell):
+        """Flag or unflag the cell."""
+        if self.client is not None:
+            self.client.move("flag", cell)
+        # Only flag closed cells.
+        elif self.stats["state"] == 0 and not self.board.opened[cell]:
+            self._record(FLAG, cell)
+            if self.board.flagged[cell]:
+                self.stats["mines_left"] += 1
+            else:
+                self.stats["mines_left"] -= 1
+            self.board.flag_cell(*cell)
+            # Update mines left image.
+            self.scoreboard.prep_mines()
+
+    def _check_explosion(self):
+        """Stop the game if a mine has exploded."""
+        if self.board.exploded is not None and self.stats["state"] == 0:
+            if self.recorder is not None:
+                self.recorder.end(False)
+            self._remove_save()
+            self.stats["state"] = -1
+            self.emoji_button.current_emoji = 0
+            pygame.time.set_timer(TIME_EVENT, 0)
+
+    def _record(self, action, cell):
+        """Record a move of the game if games are recorded."""
+        if self.recorder is not None:
+            self.recorder.record(action, *cell)
 
     def _update_screen(self):
-        """Update all the elements on the screen."""
-        # Fill the background.
-        self.screen.fill(self.settings.background_colour)
-        # Draw cells to the screen.
-        self._draw_cells()
-        # Draw button to the screen.
-        self.emoji_button.draw_button()
-        # Draw scoreboards to the screen.
-        self.scoreboard.show_scoreboards()
-        # Update the screen.
-        pygame.display.update()
-
-    def _create_cell(self, cell_x, cell_y, row_number):
-        """Create one cell and add it to cells group."""
-        cell = Cell(self)
-        cell.rect.x = cell_x
-        cell.rect.y = cell_y
-        self.cells[row_number].append(cell)
-
-        # Set cell's row and column attributes.
-        cell.column = self.cells[row_number].index(cell)
-        cell.row = row_number
-
-    def _create_row(self, row_number):
-        """Create one row of cells."""
-        for column in range(0, self.settings.cells_x):
-            cell_x = self.settings.side_margin + column*self.settings.cell_size
-            cell_y = (self.settings.top_margin
-                      + row_number*self.settings.cell_size)
-            self._create_cell(cell_x, cell_y, row_number)
-
-    def _create_grid(self):
-        """Create full grid of cells."""
-        for row in range(0, self.settings.cells_y):
-            self.cells.append([])
-            self._create_row(row)
-
-    def _draw_cells(self):
-        """Draw all cells to the screen."""
-        for row in self.cells:
-            for cell in row:
-                cell.blitme()
-
-    def _create_mines(self):
-        """Give mines to desired number of cells."""
-        # Create a temporary list of all cells.
-        temp_cells = []
-        for row in self.cells:
-            for cell in row:
-                temp_cells.append(cell)
-
-        # Create a list of random indexes.
-        mines_indexes = random.sample(
-            range(0, len(temp_cells)), self.settings.mines)
-
-        # Assign mines.
-        for index in mines_indexes:
-            temp_cells[int(index)].status = -1
-
-    def _move_mine(self, cell):
-        """Move mine to top left or first empty cell."""
-        # Find empty cell and give it a mine
-        finding_status = True
-        for row in self.cells:
-            for cell_all in row:
-                if cell_all.status != -1 and finding_status:
-                    cell_all.status = -1
-                    finding_status = False
-        # Remove mine
-        cell.status = 0
-
-        # Recalculate all neighbours
-        self._calculate_all_neighbours()
-
-    def _calculate_all_neighbours(self):
-        """Calculate neighbours of all the cells."""
-        for row in range(self.settings.cells_y):
-            for column in range(self.settings.cells_x):
-                # Stop calculating if cell has a mine.
-                if self.cells[row][column].status != -1:
-                    self._check_neighbours(row, column)
-
-    def _check_neighbours(self, row, column):
-        """Calculate neighbours of a given cell."""
-        mines = 0
-        cell_x = []
-        cell_y = []
-        # Go through all coordinates,
-        # if they are good, add them to lists of coordinates.
-        for p_value in range(column - 1, column + 2):
-            if 0 <= p_value < self.settings.cells_x:
-                cell_x.append(p_value)
-        for q_value in range(row - 1, row + 2):
-            if 0 <= q_value < self.settings.cells_y:
-                cell_y.append(q_value)
-
-        # Check every cell and add 1 to mines if it has a mine.
-        for x_value in cell_x:
-            for y_value in cell_y:
-                if self.cells[y_value][x_value].status == -1:
-                    mines += 1
-
-        # Change cell's status according
-        # to number of mines around it.
-        self.cells[row][column].status = mines
+        """Update changed elements on the screen."""
+        self.renderer.update()
 
     def _update_time(self):
-        """Update game."""
-        self.clock.tick(self.settings.game_framerate)
+        """Update game time from the wall clock."""
         if self.stats["state"] == 0:
-            self.stats["time_float"] += 1 / self.settings.game_framerate
-            self.stats["time"] = int(self.stats["time_float"])
-            # Change time every tick.
-            self.scoreboard.prep_time()
+            seconds = int(time.monotonic() - self.stats["start_time"])
+            # Change time image only when the time changes.
+            if seconds != self.stats["time"]:
+                self.stats["time"] = seconds
+                self.scoreboard.prep_time()
+                # Save the game from time to time in the background.
+                if (self.snapshots is not None
+                        and seconds % self.settings.checkpoint_seconds == 0):
+                    self._save_game()
+
+    def _create_mines(self):
+        """Give mines to the board from the pool without guessing.
+
+        Other boards get their mines with the first opened cell.
+        """
+        if self.board_pool is None:
+            return
+        mine_cells, start = self.board_pool.get(
+            self.settings.cells_x, self.settings.cells_y, self.settings.mines)
+        self.board.set_mines(mine_cells)
+        # Open the start cell, the rest can be solved from there.
+        start_cell = divmod(int(start), self.settings.cells_x)
+        self.board.open_cell(*start_cell)
+        if self.recorder is not None:
+            self.recorder.start(self.settings.cells_x, self.settings.cells_y,
+                                self.settings.mines, mine_cells=mine_cells,
+                                start_cell=start_cell)
 
     def _reset_game(self):
         """Reset game to its starting state."""
-        # Remove all cells from list and recreate the grid and mines.
-        self.cells.clear()
-        self._create_grid()
+        # Stop the clock, clear the board and create new mines.
+        pygame.time.set_timer(TIME_EVENT, 0)
+        self._remove_save()
+        self.board.reset()
         self._create_mines()
-        self._calculate_all_neighbours()
 
         # Reset stats
         self.stats = {
             "state": 2,
             "mines_left": self.settings.mines,
             "time": 0,
-            "time_float": 0
+            "start_time": 0
         }
 
         # Reset time image and mines left image.
@@ -322,7 +614,53 @@ class Minesweeper:
         # Reset emoji to the normal one
         self.emoji_button.current_emoji = 1
 
+        # Hide the leaderboard and the hint of the last game.
+        if self.renderer.leaderboard is not None:
+            self.renderer.leaderboard = None
+            self.renderer.overlay_changed = True
+        self.renderer.hint = None
+
 
 if __name__ == "__main__":
-    minesweeper = Minesweeper()
+    parser = argparse.ArgumentParser(description="Minesweeper")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every frame, F3 shows the timings")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print durations of startup phases and quit")
+    parser.add_argument("--connect", nargs="?", const="",
+                        metavar="HOST[:PORT]",
+                        help="play a new game on the game server")
+    parser.add_argument("--join", type=int, metavar="GAME",
+                        help="play a game of the server with others")
+    parser.add_argument("--watch", type=int, metavar="GAME",
+                        help="watch a game of the server")
+    args = parser.parse_args()
+
+    settings = Settings()
+    client = None
+    if (args.connect, args.join, args.watch) != (None, None, None):
+        # HOST, HOST:PORT or :PORT, IPv6 hosts with a port in brackets
+        address = args.connect or ""
+        host, port = address, ""
+        if address.count(":") == 1 or "]:" in address:
+            host, _, port = address.rpartition(":")
+            if not port.isdecimal() or not 0 < int(port) < 65536:
+                parser.error(f"invalid port in --connect {address}")
+        host = host.strip("[]") or settings.server_host
+        port = int(port or settings.server_port)
+        try:
+            client = Client(host, port)
+            info = client.start(settings.cells_x, settings.cells_y,
+                                settings.mines, args.join, args.watch)
+        except OSError as error:
+            parser.error(f"no game on {host}:{port}: {error}")
+        # The board of the server is shown, the game is only kept there.
+        settings = Settings(info["cells_x"], info["cells_y"], info["mines"])
+        settings.autosave = False
+        settings.record_replays = False
+        settings.save_results = False
+    if args.profile:
+        settings.profile = True
+    settings.profile_startup = args.profile_startup
+    minesweeper = Minesweeper(settings, client)
     minesweeper.run_game()
@@ -0,0 +1,105 @@
+"""Module with Profiler class to time the phases of every frame."""
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Phases of a frame in the order of the main loop
+PHASES = ("wait", "events", "solve", "screen", "time")
+
+
+class Profiler:
+    """Class to record timings of frame phases.
+
+    The last frames are kept for percentiles and for a Chrome trace,
+    which can be opened in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, frames=600, trace_events=100_000):
+        """Initialize profiler attributes."""
+        # Durations of the last frames in milliseconds by phase
+        self.durations = {phase: deque(maxlen=frames) for phase in PHASES}
+        self.frame_durations = deque(maxlen=frames)
+        self.frames = 0
+
+        # Trace events as (phase, start, duration) in microseconds
+        self.trace = deque(maxlen=trace_events)
+        self.origin = time.perf_counter()
+        self.frame_start = self.origin
+        self.phase_start = self.origin
+
+        # Overlay image, made again once a second while it is shown
+        self.font = None
+        self.overlay_time = 0
+
+    def start_frame(self):
+        """Start timing a new frame."""
+        self.frame_start = self.phase_start = time.perf_counter()
+
+    def mark(self, phase):
+        """End the phase, which started at the end of the last one."""
+        now = time.perf_counter()
+        duration = (now - self.phase_start) * 1000
+        self.durations[phase].append(duration)
+        self.trace.append((phase, (self.phase_start - self.origin) * 1e6,
+                           duration * 1000))
+        self.phase_start = now
+
+    def end_frame(self):
+        """End the frame after all its phases."""
+        # Waiting for events is not part of the work of the frame.
+        self.frame_durations.append(
+            (self.phase_start - self.frame_start) * 1000
+            - self.durations["wait"][-1])
+        self.frames += 1
+
+    def percentiles(self):
+        """Return p50, p95 and p99 of the last frames by phase in ms."""
+        report = {}
+        for phase, durations in (list(self.durations.items())
+                                 + [("frame", self.frame_durations)]):
+            if durations:
+                p50, p95, p99 = np.percentile(durations, (50, 95, 99))
+                report[phase] = {"p50": p50, "p95": p95, "p99": p99}
+        return report
+
+    def overlay(self, scale):
+        """Return image with percentiles, None if it is not time yet."""
+        now = time.perf_counter()
+        if now - self.overlay_time < 1:
+            return None
+        self.overlay_time = now
+
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", int(6 * scale))
+        lines = [f"{'ms':8} {'p50':>7} {'p95':>7} {'p99':>7}"]
+        for phase, values in self.percentiles().items():
+            lines.append(f"{phase:8} {values['p50']:7.3f} "
+                         f"{values['p95']:7.3f} {values['p99']:7.3f}")
+        images = [self.font.render(line, True, (255, 255, 255))
+                  for line in lines]
+        height = images[0].get_height()
+        margin = height // 2
+        image = pygame.Surface(
+            (max(line.get_width() for line in images) + 2 * margin,
+             len(images) * height + 2 * margin))
+        image.fill((0, 0, 0))
+        for index, line in enumerate(images):
+            image.blit(line, (margin, margin + index * height))
+        return image
+
+    def dump(self, path, trace_path):
+        """Write percentiles to path and a Chrome trace to trace_path."""
+        with open(path, "w") as file_object:
+            json.dump({"frames": self.frames,
+                       "percentiles_ms": self.percentiles()},
+                      file_object, indent=2)
+        events = [{"name": phase, "ph": "X", "ts": start, "dur": duration,
+                   "pid": 0, "tid": 0}
+                  for phase, start, duration in self.trace]
+        with open(trace_path, "w") as file_object:
+            json.dump({"traceEvents": events}, file_object)
@@ -0,0 +1,278 @@
+"""Module with Renderer class for Minesweeper."""
+
+import numpy as np
+import pygame
+
+from atlas import get_atlas
+
+
+class Renderer:
+    """Class to draw only the parts of the screen that have changed."""
+
+    def __init__(self, minesweeper):
+        """Initialize renderer attributes."""
+        self.screen = minesweeper.screen
+        self.settings = minesweeper.settings
+        self.my_path = minesweeper.my_path
+        self.atlas = minesweeper.atlas
+        self.board = minesweeper.board
+        self.viewport = minesweeper.viewport
+        self.emoji_button = minesweeper.emoji_button
+        self.scoreboard = minesweeper.scoreboard
+        self.solver = minesweeper.solver
+
+        # Visible cells are drawn to a persistent surface, which is copied
+        # to the screen where cells have changed.
+        self.board_rect = self.viewport.rect
+        self.board_surface = pygame.Surface(self.board_rect.size).convert()
+
+        # Emoji currently on the screen
+        self.current_emoji = None
+
+        # Solver overlay: mine probabilities of closed cells and the flat
+        # index of the hinted cell, both are cleared by the next move.
+        self.show_probabilities = False
+        self.probabilities = None
+        self.hint = None
+        self.overlay_changed = False
+        self._overlay_images = {}
+
+        # Lines of the leaderboard shown over the board or None. The font
+        # is loaded when it is first shown.
+        self.leaderboard = None
+        self._leaderboard_font = None
+
+        # Profiler overlay in the top left corner of the board or None,
+        # drawn on the screen over the cells.
+        self.profile_image = None
+        self.profile_changed = False
+        self._profile_rect = None
+
+    def update(self):
+        """Draw changed elements and update their areas of the screen."""
+        changed = self.board.pop_changed()
+        x_moved, y_moved, zoomed = self.viewport.pop_moved()
+
+        # Any move changes probabilities and makes the hint old. A full
+        # redraw, like after the window was covered, keeps them.
+        if changed is not None and len(changed):
+            if self.hint is not None:
+                self.hint = None
+                self.overlay_changed = True
+            if self.show_probabilities:
+                self.overlay_changed = True
+        elif changed is None:
+            self.overlay_changed = True
+        # The leaderboard covers cells, so the view is drawn again with it.
+        if self.leaderboard is not None and (
+                changed is None or len(changed) or x_moved or y_moved):
+            self.overlay_changed = True
+        if self.overlay_changed and self.show_probabilities:
+            self.probabilities = self.solver.solve()
+
+        if changed is None:
+            self._draw_all()
+            return
+
+        rects = []
+        if zoomed or self.overlay_changed:
+            # The whole view is drawn with the changed cells.
+            rects.append(self._draw_view())
+        else:
+            if x_moved or y_moved:
+                rects.append(self._scroll_view(x_moved, y_moved))
+            if len(changed):
+                rect = self._draw_cells(changed)
+                if rect is not None:
+                    rects.append(rect)
+        if self.emoji_button.current_emoji != self.current_emoji:
+            rects.append(self._draw_button())
+        if self.scoreboard.dirty_rects:
+            rects.extend(self._draw_scoreboards())
+        if self.profile_changed or (
+                self._profile_rect is not None
+                and self._profile_rect.collidelist(rects) != -1):
+            rects.extend(self._draw_profile())
+        if rects:
+            pygame.display.update(rects)
+
+    def _draw_all(self):
+        """Draw every element and update the whole screen."""
+        self.screen.fill(self.settings.background_colour)
+        self._draw_view()
+        self._draw_button()
+        self._draw_scoreboards()
+        self._profile_rect = None
+        self._draw_profile()
+        pygame.display.update()
+
+    def _draw_view(self):
+        """Draw all visible cells, return the screen area of the board."""
+        self.atlas = get_atlas(self.my_path, self.viewport.scale)
+        self.overlay_changed = False
+        self._draw_area(self.board_surface.get_rect())
+        if self.leaderboard is not None:
+            self._blit_leaderboard()
+        self.screen.blit(self.board_surface, self.board_rect)
+        return self.board_rect
+
+    def _scroll_view(self, x_moved, y_moved):
+        """Move drawn cells and draw the uncovered strips of the view."""
+        view = self.board_surface.get_rect()
+        self.board_surface.scroll(-x_moved, -y_moved)
+        # Strips of the view left without cells after scrolling
+        if x_moved > 0:
+            self._draw_area(pygame.Rect(
+                view.width - x_moved, 0, x_moved, view.height))
+        elif x_moved < 0:
+            self._draw_area(pygame.Rect(0, 0, -x_moved, view.height))
+        if y_moved > 0:
+            self._draw_area(pygame.Rect(
+                0, view.height - y_moved, view.width, y_moved))
+        elif y_moved < 0:
+            self._draw_area(pygame.Rect(0, 0, view.width, -y_moved))
+        self.screen.blit(self.board_surface, self.board_rect)
+        return self.board_rect
+
+    def _draw_area(self, area):
+        """Draw cells in an area of the view to the board surface."""
+        area = area.clip(self.board_surface.get_rect())
+        if not area.width or not area.height:
+            return
+        self.board_surface.fill(self.settings.background_colour, area)
+        first_row, last_row, first_column, last_column = (
+            self.viewport.visible_cells(area))
+        if first_row >= last_row or first_column >= last_column:
+            return
+        rows = np.arange(first_row, last_row)
+        columns = np.arange(first_column, last_column)
+        cells = (rows[:, np.newaxis] * self.settings.cells_x
+                 + columns).ravel()
+        self._blit_cells(cells)
+
+    def _blit_cells(self, cells):
+        """Blit cells with given flat indexes to the board surface.
+
+        Return the area of the view with all the cells.
+        """
+        cell_size = self.viewport.cell_size
+        rows, columns = np.divmod(cells, self.settings.cells_x)
+        xs = columns * cell_size - self.viewport.x
+        ys = rows * cell_size - self.viewport.y
+        images = self.atlas.cells
+        self.board_surface.blits(
+            [(images[tile], (x, y)) for tile, x, y in zip(
+                self.board.tiles(cells).tolist(), xs.tolist(), ys.tolist())],
+            doreturn=False)
+        if self.show_probabilities or self.hint is not None:
+            self._blit_overlay(cells, xs, ys)
+        return pygame.Rect(xs.min(), ys.min(),
+                           xs.max() - xs.min() + cell_size,
+                           ys.max() - ys.min() + cell_size)
+
+    def _blit_overlay(self, cells, xs, ys):
+        """Blit probabilities and the hint over cells."""
+        cell_size = self.viewport.cell_size
+        if self.show_probabilities:
+            images = self._get_overlay_images(cell_size)
+            probabilities = self.probabilities.reshape(-1)[cells]
+            shown = ~np.isnan(probabilities)
+            levels = np.rint(probabilities[shown] * (len(images) - 1))
+            self.board_surface.blits(
+                [(images[level], (x, y)) for level, x, y in zip(
+                    levels.astype(int).tolist(), xs[shown].tolist(),
+                    ys[shown].tolist())],
+                doreturn=False)
+        if self.hint is not None and self.hint in cells:
+            position = np.flatnonzero(cells == self.hint)[0]
+            pygame.draw.rect(
+                self.board_surface, self.settings.hint_colour,
+                (xs[position], ys[position], cell_size, cell_size),
+                max(cell_size // 8, 1))
+
+    def _get_overlay_images(self, cell_size):
+        """Return see-through cells from green to red for probabilities."""
+        images = self._overlay_images.get(cell_size)
+        if images is None:
+            images = []
+            for level in range(11):
+                image = pygame.Surface((cell_size, cell_size),
+                                       pygame.SRCALPHA)
+                image.fill((25 * level, 250 - 25 * level, 0, 110))
+                images.append(image)
+            self._overlay_images[cell_size] = images
+        return images
+
+    def _blit_leaderboard(self):
+        """Blit the leaderboard to the middle of the board surface."""
+        if self._leaderboard_font is None:
+            pygame.font.init()
+            self._leaderboard_font = pygame.font.SysFont(
+                None, 10 * self.settings.scale)
+        images = [self._leaderboard_font.render(line, True, (30, 30, 30))
+                  for line in self.leaderboard]
+        margin = self.settings.inner_margin
+        width = max(image.get_width() for image in images) + 2 * margin
+        height = sum(image.get_height() for image in images) + 2 * margin
+        panel = pygame.Rect(0, 0, width, height)
+        panel.center = self.board_surface.get_rect().center
+        self.board_surface.fill(self.settings.background_colour, panel)
+        pygame.draw.rect(self.board_surface, (30, 30, 30), panel, 1)
+        y = panel.y + margin
+        for image in images:
+            self.board_surface.blit(image, (panel.x + margin, y))
+            y += image.get_height()
+
+    def _draw_cells(self, cells):
+        """Draw visible cells with given flat indexes.
+
+        Return their screen area or None if none of them is visible.
+        """
+        first_row, last_row, first_column, last_column = (
+            self.viewport.visible_cells())
+        rows, columns = np.divmod(cells, self.settings.cells_x)
+        visible = ((first_row <= rows) & (rows < last_row)
+                   & (first_column <= columns) & (columns < last_column))
+        cells = cells[visible]
+        if not len(cells):
+            return None
+
+        # Copy the area with all the changed cells to the screen.
+        area = self._blit_cells(cells).clip(self.board_surface.get_rect())
+        rect = area.move(self.board_rect.topleft)
+        self.screen.blit(self.board_surface, rect, area)
+        return rect
+
+    def _draw_profile(self):
+        """Draw the profiler overlay, return changed screen areas."""
+        rects = []
+        # Cells under the old overlay are drawn again first.
+        if self._profile_rect is not None:
+            area = self._profile_rect.move(-self.board_rect.x,
+                                           -self.board_rect.y)
+            self.screen.blit(self.board_surface, self._profile_rect, area)
+            rects.append(self._profile_rect)
+            self._profile_rect = None
+        if self.profile_image is not None:
+            rect = self.profile_image.get_rect(
+                topleft=self.board_rect.topleft).clip(self.board_rect)
+            self.screen.blit(self.profile_image, rect, ((0, 0), rect.size))
+            rects.append(rect)
+            self._profile_rect = rect
+        self.profile_changed = False
+        return rects
+
+    def _draw_button(self):
+        """Draw the emoji button, return its screen area."""
+        self.current_emoji = self.emoji_button.current_emoji
+        self.emoji_button.draw_button()
+        return self.emoji_button.rect
+
+    def _draw_scoreboards(self):
+        """Draw both scoreboards, return changed screen areas."""
+        rects = self.scoreboard.dirty_rects
+        self.scoreboard.dirty_rects = []
+        for rect in rects:
+            self.screen.fill(self.settings.background_colour, rect)
+        self.scoreboard.show_scoreboards()
+        return rects
@@ -0,0 +1,322 @@
+"""Module to record games to a compact binary log and play them back.
+
+A log is a sequence of 9 byte records: action, row, column and delay in
+milliseconds since the previous record of the game. Every game starts with
+a START record with the board size and number of mines, followed by its
+seed or its mines and the moves. Seeded mines are placed with the first
+opened cell, like in the game. Logs of many games are simply appended,
+so they can be scanned with a memory map.
+
+Example: python replay.py replays.bin --verify
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from board import Board, three_bv
+
+# Actions of the records. START has cells_y as row, cells_x as column and
+# mines as delay. SEED keeps the 8 bytes of the seed in row, column and
+# delay, SAFE_AREA follows it if neighbours of the first cell are safe too.
+# MINE and START_CELL set up boards without a seed, END has 1 as row for a
+# won game and 0 for a lost one.
+START = 0
+SEED = 1
+SAFE_AREA = 2
+MINE = 3
+START_CELL = 4
+OPEN = 5
+FLAG = 6
+CHORD = 7
+END = 8
+
+RECORD = np.dtype([("action", "u1"), ("row", "<u2"), ("column", "<u2"),
+                   ("delay", "<u4")])
+_RECORD = struct.Struct("<BHHI")
+_SEED = struct.Struct("<BQ")
+
+
+class Recorder:
+    """Class to append games to a replay log while they are played.
+
+    Records go to a file buffer, which is written at the end of a game,
+    so a move never waits for the disk. The header of a game is only
+    written with its first move, boards without moves are not kept.
+    """
+
+    def __init__(self, path):
+        """Open the log for appending."""
+        self.file_object = open(path, "ab", buffering=64 * 1024)
+        self.header = None
+        self.recording = False
+        self.start_time = 0
+        self.last_ms = 0
+
+    def start(self, cells_x, cells_y, mines, seed=None, safe_area=False,
+              mine_cells=None, start_cell=None):
+        """Start a new game with the seed or the mines of its board."""
+        header = [_RECORD.pack(START, cells_y, cells_x, mines)]
+        if seed is not None:
+            header.append(_SEED.pack(SEED, seed))
+            if safe_area:
+                header.append(_RECORD.pack(SAFE_AREA, 0, 0, 0))
+        else:
+            records = np.zeros(len(mine_cells), dtype=RECORD)
+            records["action"] = MINE
+            records["row"], records["column"] = np.divmod(
+                mine_cells, cells_x)
+            header.append(records.tobytes())
+        if start_cell is not None:
+            header.append(_RECORD.pack(START_CELL, *start_cell, 0))
+        self.header = b"".join(header)
+        self.recording = False
+        self.start_time = time.monotonic()
+        self.last_ms = 0
+
+    def stop(self):
+        """Don't record the rest of the current game."""
+        self.header = None
+        self.recording = False
+
+    def record(self, action, row, column):
+        """Add a move of the current game."""
+        if self.header is None:
+            return
+        if not self.recording:
+            self.file_object.write(self.header)
+            self.recording = True
+        # Delays are rounded from the start of the game, so their sum
+        # doesn't drift from the real time.
+        ms = round((time.monotonic() - self.start_time) * 1000)
+        self.file_object.write(
+            _RECORD.pack(action, row, column, ms - self.last_ms))
+        self.last_ms = ms
+
+    def end(self, won):
+        """End the game and write it to the log."""
+        if self.recording:
+            self.record(END, int(won), 0)
+            self.file_object.flush()
+            self.recording = False
+
+    def close(self):
+        """Write everything and close the log."""
+        self.file_object.close()
+
+
+class Replay:
+    """Class to represent one recorded game."""
+
+    def __init__(self, records):
+        """Read the board from the records of the game."""
+        self.cells_y = int(records["row"][0])
+        self.cells_x = int(records["column"][0])
+        self.mines = int(records["delay"][0])
+
+        actions = records["action"]
+        self.seed = None
+        if len(records) > 1 and actions[1] == SEED:
+            self.seed = _SEED.unpack(records[1:2].tobytes())[1]
+        self.safe_area = bool((actions == SAFE_AREA).any())
+        mine_records = records[actions == MINE]
+        self.mine_cells = (mine_records["row"].astype(np.int64)
+                           * self.cells_x + mine_records["column"])
+        self.start_cell = None
+        start_cells = records[actions == START_CELL]
+        if len(start_cells):
+            self.start_cell = (int(start_cells["row"][0]),
+                               int(start_cells["column"][0]))
+
+        # Moves with the end record, if the game was finished
+        self.moves = records[actions >= OPEN]
+
+    @property
+    def result(self):
+        """Return recorded result: True won, False lost, None unfinished."""
+        if len(self.moves) and self.moves["action"][-1] == END:
+            return bool(self.moves["row"][-1])
+        return None
+
+    def prepare(self, board, row, column):
+        """Give the recorded mines to a reset board before the first move.
+
+        Row and column are of the first opened cell.
+        """
+        if self.seed is not None:
+            board.create_mines(row, column, self.seed, self.safe_area)
+            return
+        board.set_mines(self.mine_cells)
+        if self.start_cell is not None:
+            board.open_cell(*self.start_cell)
+
+    def seconds(self):
+        """Return the game time from the first move to the end."""
+        return int(self.moves["delay"][1:].sum()) / 1000
+
+
+def read_records(path):
+    """Return all records of a log, memory mapped from the file."""
+    size = os.path.getsize(path)
+    if size < RECORD.itemsize:
+        return np.zeros(0, dtype=RECORD)
+    with open(path, "rb") as file_object:
+        memory = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+    # A record cut off at the end of the file is left out.
+    return np.frombuffer(memory, dtype=RECORD,
+                         count=size // RECORD.itemsize)
+
+
+def read_replays(path):
+    """Return replays of all games in a log with at least one move.
+
+    A game cut off after its header at the end of the log is left out.
+    """
+    records = read_records(path)
+    starts = np.flatnonzero(records["action"] == START)
+    return [Replay(game) for game in np.split(records, starts[1:])
+            if len(game) > 1 and (game["action"] >= OPEN).any()]
+
+
+def summary(path):
+    """Return numbers of games and moves without playing them."""
+    records = read_records(path)
+    actions = records["action"]
+    results = records["row"][actions == END]
+    return {
+        "games": int(np.count_nonzero(actions == START)),
+        "won": int(np.count_nonzero(results == 1)),
+        "lost": int(np.count_nonzero(results == 0)),
+        "moves": int(np.count_nonzero((actions >= OPEN) & (actions < END))),
+    }
+
+
+def play_headless(replay, board=None):
+    """Play the moves on a board as fast as possible.
+
+    A board of the same size can be given to be reused. Return if the
+    game was won, lost or None if it was not finished.
+    """
+    if board is None:
+        board = Board(replay.cells_x, replay.cells_y, replay.mines)
+    board.reset()
+
+    for action, row, column, _ in replay.moves.tolist():
+        if not board.mines_placed:
+            replay.prepare(board, row, column)
+        if action == OPEN:
+            board.open_cell(row, column)
+        elif action == FLAG:
+            board.flag_cell(row, column)
+        elif action == CHORD:
+            board.chord(row, column)
+        if board.exploded is not None:
+            return False
+        if board.is_solved():
+            return True
+    return None
+
+
+def verify(path):
+    """Play all games of a log and compare them with recorded results.
+
+    Won games are listed as (index, seconds, 3BV/s), with times from the
+    delays of their moves and 3BV of the played boards.
+    """
+    start = time.perf_counter()
+    boards = {}
+    games = 0
+    mismatches = []
+    won = []
+    for index, replay in enumerate(read_replays(path)):
+        size = (replay.cells_x, replay.cells_y, replay.mines)
+        if size not in boards:
+            boards[size] = Board(*size)
+        result = play_headless(replay, boards[size])
+        if replay.result is not None and result != replay.result:
+            mismatches.append(index)
+        if result:
+            seconds = replay.seconds()
+            bbbv = three_bv(boards[size].mines)
+            won.append((index, seconds, bbbv / seconds if seconds else None))
+        games += 1
+    duration = time.perf_counter() - start
+    return {
+        "games": games,
+        "mismatches": mismatches,
+        "won": won,
+        "games_per_second": games / duration if duration else 0,
+    }
+
+
+def play(replay, speed=1):
+    """Play the moves in the game window, speed times faster."""
+    from minesweeper import Minesweeper
+    from settings import Settings
+
+    settings = Settings(replay.cells_x, replay.cells_y, replay.mines)
+    settings.idle_sleep = False
+    settings.record_replays = False
+    settings.save_results = False
+    settings.autosave = False
+    settings.no_guess = False
+    game = Minesweeper(settings)
+
+    next_time = time.monotonic()
+    for action, row, column, delay in replay.moves.tolist():
+        next_time += delay / 1000 / speed
+        while time.monotonic() < next_time:
+            game._check_events()
+            game._update_screen()
+            game._update_time()
+        cell = (row, column)
+        if not game.board.mines_placed:
+            replay.prepare(game.board, row, column)
+        if action == OPEN:
+            game._open_cell(cell)
+        elif action == FLAG:
+            game._flag_cell(cell)
+        elif action == CHORD:
+            game._chord_cell(cell)
+        game._check_solve()
+    # Keep the window open until it is closed.
+    game.run_game()
+
+
+def main():
+    """Print a summary of a log, verify it or play one of its games."""
+    parser = argparse.ArgumentParser(description="Minesweeper replays.")
+    parser.add_argument("log")
+    parser.add_argument("--verify", action="store_true",
+                        help="play all games without a display")
+    parser.add_argument("--play", type=int, metavar="INDEX",
+                        help="play a game in the window")
+    parser.add_argument("--speed", type=float, default=1)
+    args = parser.parse_args()
+
+    if args.play is not None:
+        play(read_replays(args.log)[args.play], args.speed)
+    elif args.verify:
+        report = verify(args.log)
+        print(f"{report['games']} games, "
+              f"{len(report['mismatches'])} mismatches, "
+              f"{report['games_per_second']:.0f} games per second")
+        for index in report["mismatches"]:
+            print(f"  game {index} has a different result")
+        if report["won"]:
+            _, times, speeds = zip(*report["won"])
+            speeds = [speed for speed in speeds if speed is not None]
+            line = f"{len(times)} won, best time {min(times):.3f} s"
+            if speeds:
+                line += f", best {max(speeds):.2f} 3BV/s"
+            print(line)
+    else:
+        print(summary(args.log))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Module with ResultsStore class to keep results of won games.
+
+Old results.txt files can be imported once from the command line:
+python results.py --import results.txt
+"""
+
+import argparse
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+from board import three_bv
+
+# Line of the old results.txt, for example: 8x8: 12 s (10 mines)
+_TEXT_RESULT = re.compile(r"(\d+)x(\d+): (\d+(?:\.\d+)?) s \((\d+) mines\)")
+
+
+class ResultsStore:
+    """Class to store results in SQLite and query leaderboards.
+
+    Results are written by a background thread, so saving a result never
+    waits for the disk or for counting the 3BV of a big board.
+    """
+
+    def __init__(self, path):
+        """Open the database and start the writer thread."""
+        self.path = path
+        self.connection = self._connect()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY,
+                cells_x INTEGER NOT NULL,
+                cells_y INTEGER NOT NULL,
+                mines INTEGER NOT NULL,
+                time REAL NOT NULL,
+                seed INTEGER,
+                timestamp REAL NOT NULL,
+                bbbv INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS results_by_time
+                ON results (cells_x, cells_y, mines, time);
+            CREATE TABLE IF NOT EXISTS imports (path TEXT PRIMARY KEY);
+        """)
+        # 3BV of the board was added later, old results don't have it.
+        columns = [row[1] for row in self.connection.execute(
+            "PRAGMA table_info(results)")]
+        if "bbbv" not in columns:
+            with self.connection:
+                self.connection.execute(
+                    "ALTER TABLE results ADD COLUMN bbbv INTEGER")
+
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        """Return a new connection to the database in WAL mode."""
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _write(self):
+        """Write queued results until None is queued."""
+        connection = self._connect()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            result, mines_mask, saved = item
+            if mines_mask is not None:
+                result = result[:-1] + (three_bv(mines_mask),)
+            with connection:
+                connection.execute(
+                    "INSERT INTO results (cells_x, cells_y, mines, time, "
+                    "seed, timestamp, bbbv) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    result)
+            if saved is not None:
+                saved(result[-1])
+        connection.close()
+
+    def add(self, cells_x, cells_y, mines, seconds, seed=None,
+            timestamp=None, bbbv=None, mines_mask=None, saved=None):
+        """Queue the result of a won game to be saved.
+
+        bbbv is the 3BV of the board, 3BV/s is counted from it. Given the
+        mask of mines of the board instead, the writer counts it. saved is
+        called with the 3BV by the writer thread once the result is saved.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.queue.put(((cells_x, cells_y, mines, seconds, seed, timestamp,
+                         bbbv), mines_mask, saved))
+
+    def flush(self):
+        """Wait until all queued results are saved."""
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    def close(self):
+        """Save queued results and close the database."""
+        self.queue.put(None)
+        self.writer.join()
+        self.connection.close()
+
+    def count(self, cells_x, cells_y, mines):
+        """Return number of results for the configuration."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM results "
+            "WHERE cells_x = ? AND cells_y = ? AND mines = ?",
+            (cells_x, cells_y, mines)).fetchone()[0]
+
+    def best_times(self, cells_x, cells_y, mines, limit=10):
+        """Return list of (time, timestamp, 3BV/s) of the best results.
+
+        3BV/s is None for results without 3BV.
+        """
+        return self.connection.execute(
+            "SELECT time, timestamp, bbbv / time FROM results "
+            "WHERE cells_x = ? AND cells_y = ? AND mines = ? "
+            "ORDER BY time LIMIT ?",
+            (cells_x, cells_y, mines, limit)).fetchall()
+
+    def time_at_percentile(self, cells_x, cells_y, mines, percentile):
+        """Return the time at percentile (0-100) or None without results."""
+        count = self.count(cells_x, cells_y, mines)
+        if not count:
+            return None
+        offset = round(percentile / 100 * (count - 1))
+        return self.connection.execute(
+            "SELECT time FROM results "
+            "WHERE cells_x = ? AND cells_y = ? AND mines = ? "
+            "ORDER BY time LIMIT 1 OFFSET ?",
+            (cells_x, cells_y, mines, offset)).fetchone()[0]
+
+    def percentile_of(self, cells_x, cells_y, mines, seconds):
+        """Return percentage of results slower than the time."""
+        count = self.count(cells_x, cells_y, mines)
+        if not count:
+            return 100.0
+        slower = self.connection.execute(
+            "SELECT COUNT(*) FROM results "
+            "WHERE cells_x = ? AND cells_y = ? AND mines = ? AND time > ?",
+            (cells_x, cells_y, mines, seconds)).fetchone()[0]
+        return 100 * slower / count
+
+    def import_text(self, path):
+        """Import results from an old results.txt file once.
+
+        Return number of imported results, 0 if the file was imported
+        before or doesn't exist.
+        """
+        path = os.path.realpath(path)
+        if not os.path.exists(path):
+            return 0
+        with self.connection:
+            if self.connection.execute(
+                    "SELECT 1 FROM imports WHERE path = ?",
+                    (path,)).fetchone():
+                return 0
+            # Old results have no date, use the date of the file.
+            timestamp = os.path.getmtime(path)
+            results = []
+            with open(path) as file_object:
+                for line in file_object:
+                    match = _TEXT_RESULT.match(line.strip())
+                    if match:
+                        cells_x, cells_y, seconds, mines = match.groups()
+                        results.append((int(cells_x), int(cells_y),
+                                        int(mines), float(seconds), None,
+                                        timestamp))
+            self.connection.executemany(
+                "INSERT INTO results (cells_x, cells_y, mines, time, seed, "
+                "timestamp) VALUES (?, ?, ?, ?, ?, ?)", results)
+            self.connection.execute(
+                "INSERT INTO imports (path) VALUES (?)", (path,))
+        return len(results)
+
+
+def main():
+    """Import results or print the leaderboard."""
+    parser = argparse.ArgumentParser(description="Minesweeper results.")
+    parser.add_argument("--database", default=os.path.join(
+        os.path.dirname(os.path.realpath(__file__)), "results.db"))
+    parser.add_argument("--import", dest="import_path", metavar="FILE",
+                        help="import an old results.txt file")
+    parser.add_argument("--board", nargs=3, type=int, default=(8, 8, 10),
+                        metavar=("CELLS_X", "CELLS_Y", "MINES"))
+    args = parser.parse_args()
+
+    store = ResultsStore(args.database)
+    if args.import_path:
+        imported = store.import_text(args.import_path)
+        print(f"Imported {imported} results.")
+    else:
+        print(f"{store.count(*args.board)} results")
+        for place, (seconds, timestamp, speed) in enumerate(
+                store.best_times(*args.board), 1):
+            date = time.strftime("%Y-%m-%d", time.localtime(timestamp))
+            line = f"{place:2}. {seconds:7.2f} s  {date}"
+            if speed is not None:
+                line += f"  {speed:6.2f} 3BV/s"
+            print(line)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
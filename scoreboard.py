@@ -1,6 +1,6 @@
 """Module with Scoreboard class for Minesweeper."""
 
-import pygame.font
+import pygame
 
 
 class Scoreboard:
@@ -13,42 +13,61 @@ class Scoreboard:
         self.screen_rect = self.screen.get_rect()
         self.settings = minesweeper.settings
 
-        # Font settings
-        self.font_colour = (30, 30, 30)
-        font_size = 32 * self.settings.scale
-        self.font = pygame.font.SysFont(None, font_size)
+        # Digit images by character, numbers are put together from them.
+        atlas = minesweeper.atlas
+        self.glyphs = {str(digit): image
+                       for digit, image in enumerate(atlas.digits)}
+        self.glyphs["-"] = atlas.minus
+        self.glyph_width, self.glyph_height = atlas.digits[0].get_size()
+
+        # Areas of the screen where the scoreboards have changed.
+        self.dirty_rects = []
+        self.time_rect = None
+        self.mines_left_rect = None
 
         # Prepare the initial images
         self.prep_time()
         self.prep_mines()
 
+    def _compose(self, value):
+        """Put together the image of a number with 3 characters."""
+        # Like in classic Minesweeper the counters stop at 999 and -99, so
+        # they never grow into the emoji.
+        text = f"{min(max(value, -99), 999):03d}"
+        image = pygame.Surface(
+            (len(text) * self.glyph_width, self.glyph_height)).convert()
+        image.blits([(self.glyphs[character], (index * self.glyph_width, 0))
+                     for index, character in enumerate(text)],
+                    doreturn=False)
+        return image
+
     def prep_time(self):
-        """Turn time into a rendered image."""
-        time = self.minesweeper.stats["time"]
-        time_str = str(time)
-        self.time_image = self.font.render(
-            time_str, True, self.font_colour, self.settings.background_colour)
+        """Turn time into an image of digits."""
+        self.time_image = self._compose(self.minesweeper.stats["time"])
 
         # Display time to the right of the emoji.
+        if self.time_rect is not None:
+            self.dirty_rects.append(self.time_rect)
         self.time_rect = self.time_image.get_rect()
         self.time_rect.centery = self.minesweeper.emoji_button.rect.centery
         self.time_rect.x = (self.settings.screen_width
                             - self.settings.side_margin
                             - self.time_rect.width)
+        self.dirty_rects.append(self.time_rect)
 
     def prep_mines(self):
-        """Turn mines_left into a rendered image."""
-        mines_left = self.minesweeper.stats["mines_left"]
-        mines_left_str = str(mines_left)
-        self.mines_left_image = self.font.render(
-            mines_left_str, True, self.font_colour,
-            self.settings.background_colour)
+        """Turn mines_left into an image of digits."""
+        self.mines_left_image = self._compose(
+            self.minesweeper.stats["mines_left"])
 
         # Display mines left to the left of the emoji.
+        if self.mines_left_rect is not None:
+            self.dirty_rects.append(self.mines_left_rect)
         self.mines_left_rect = self.mines_left_image.get_rect()
         self.mines_left_rect.centery = (
             self.minesweeper.emoji_button.rect.centery)
         self.mines_left_rect.x = self.settings.side_margin
+        self.dirty_rects.append(self.mines_left_rect)
 
     def show_scoreboards(self):
         """Draw time and mines left scoreboards to the screen."""
@@ -0,0 +1,327 @@
+"""Module with an asyncio server to host many games for remote players.
+
+Clients send JSON messages, one per line, over TCP:
+
+    {"type": "new", "cells_x": 8, "cells_y": 8, "mines": 10}
+    {"type": "join", "game": 1} or {"type": "watch", "game": 1}
+    {"type": "open", "game": 1, "row": 3, "column": 4}
+    {"type": "flag", ...}, {"type": "chord", ...}
+    {"type": "reset", "game": 1}, {"type": "leave", "game": 1}
+
+The server answers new, join and watch with a game message with the board
+size and state. After every move all players and spectators of the game
+get a delta with the flat indexes and tile codes of the changed cells and
+the new state, never the whole board. Players can make moves, spectators
+only watch. Errors are sent back as error messages.
+
+Example: python server.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from board import Board, forget_neighbour_table
+from settings import Settings
+
+
+def _integer(message, key):
+    """Return the integer of the message with the key."""
+    value = message[key]
+    # Booleans are integers too and floats such as 1e400 can't be cells.
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{key} has to be an integer.")
+    return value
+
+
+class Game:
+    """Class to play one game with the rules of the window game."""
+
+    def __init__(self, game_id, cells_x, cells_y, mines):
+        """Initialize game attributes."""
+        self.game_id = game_id
+        self.board = Board(cells_x, cells_y, mines)
+        # 0 means playing, -1 is dead, 1 solved, 2 start
+        self.state = 2
+        self.mines_left = mines
+        self.start_time = 0
+        self.last_move = time.monotonic()
+
+        # Connections of players, who make moves, and of spectators
+        self.players = set()
+        self.spectators = set()
+
+    def open_cell(self, row, column):
+        """Open the cell, the first one starts the game."""
+        if self.state == 2:
+            self.state = 0
+            self.start_time = time.monotonic()
+            self.board.create_mines(row, column)
+        if self.state == 0:
+            self.board.open_cell(row, column)
+            self._check_end()
+
+    def chord(self, row, column):
+        """Open all the cells around the cell."""
+        if self.state == 0:
+            self.board.chord(row, column)
+            self._check_end()
+
+    def flag_cell(self, row, column):
+        """Flag or unflag the closed cell."""
+        if self.state == 0 and not self.board.opened[row, column]:
+            self.mines_left += 1 if self.board.flagged[row, column] else -1
+            self.board.flag_cell(row, column)
+
+    def reset(self):
+        """Reset game to its starting state."""
+        self.board.reset()
+        self.state = 2
+        self.mines_left = self.board.mines_number
+        # Nothing has to be sent about the cleared board.
+        self.board.pop_changed()
+
+    def _check_end(self):
+        """Stop the game if a mine has exploded or the board is solved."""
+        if self.board.exploded is not None:
+            self.state = -1
+        elif self.board.is_solved():
+            self.state = 1
+            self.board.flag_mines()
+
+    def elapsed(self):
+        """Return seconds since the first move of the running game."""
+        if self.state == 0:
+            return time.monotonic() - self.start_time
+        return 0
+
+    def info(self, role):
+        """Return game message for a new player or spectator."""
+        return {"type": "game", "game": self.game_id, "role": role,
+                "cells_x": self.board.cells_x,
+                "cells_y": self.board.cells_y,
+                "mines": self.board.mines_number, "state": self.state,
+                "mines_left": self.mines_left, "elapsed": self.elapsed()}
+
+    def delta(self, cells):
+        """Return delta message with tiles of cells with flat indexes."""
+        cells = np.unique(cells)
+        return {"type": "delta", "game": self.game_id,
+                "cells": cells.tolist(),
+                "tiles": self.board.tiles(cells).tolist(),
+                "state": self.state, "mines_left": self.mines_left}
+
+    def pop_delta(self):
+        """Return delta message of cells changed since the last one."""
+        changed = self.board.pop_changed()
+        if changed is None:
+            changed = self.view_cells()
+        return self.delta(changed)
+
+    def view_cells(self):
+        """Return flat indexes of cells which are not closed."""
+        return np.flatnonzero(self.board.opened | self.board.flagged)
+
+
+class Connection:
+    """Class to send messages to one client without waiting for it."""
+
+    def __init__(self, writer, send_bytes):
+        """Initialize connection attributes."""
+        self.writer = writer
+        self.send_bytes = send_bytes
+        # Games the client plays or watches by id
+        self.games = set()
+        self.closed = False
+
+    def send(self, message):
+        """Send one message."""
+        self.send_data(json.dumps(message).encode() + b"\n")
+
+    def send_data(self, data):
+        """Send an encoded message, drop the client if it is too slow."""
+        if self.closed:
+            return
+        if self.writer.transport.get_write_buffer_size() > self.send_bytes:
+            self.close()
+            return
+        self.writer.write(data)
+
+    def close(self):
+        """Close the connection at once."""
+        self.closed = True
+        self.writer.transport.abort()
+
+
+class GameServer:
+    """Class to host games and send their changes to clients."""
+
+    def __init__(self, settings):
+        """Initialize server attributes."""
+        self.settings = settings
+        self.games = {}
+        self.next_id = 1
+        # Number of games by board shape, neighbour tables of shapes
+        # without games are dropped.
+        self.shapes = {}
+
+    async def serve(self, host, port):
+        """Accept clients and close idle games until cancelled."""
+        server = await asyncio.start_server(
+            self._handle, host, port,
+            limit=self.settings.server_message_bytes)
+        async with server:
+            while True:
+                await asyncio.sleep(self.settings.server_idle_seconds / 10)
+                self._close_idle_games()
+
+    async def _handle(self, reader, writer):
+        """Read messages of one client until it disconnects."""
+        connection = Connection(writer, self.settings.server_send_bytes)
+        try:
+            while not connection.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self._dispatch(connection, json.loads(line))
+                except (ValueError, KeyError, TypeError,
+                        RecursionError) as error:
+                    # Deeply nested JSON is too deep for the decoder.
+                    connection.send({"type": "error", "message": str(error)})
+        except (ConnectionError, ValueError):
+            # Lost connections and too long messages end the client.
+            pass
+        finally:
+            for game_id in list(connection.games):
+                self._leave(connection, game_id)
+            connection.close()
+
+    def _dispatch(self, connection, message):
+        """Respond to a message of a client."""
+        kind = message["type"]
+        if kind == "new":
+            game = self._new_game(_integer(message, "cells_x"),
+                                  _integer(message, "cells_y"),
+                                  _integer(message, "mines"))
+            self._join(connection, game, "player")
+        elif kind in ("join", "watch"):
+            game = self._game(message)
+            self._join(connection, game,
+                       "player" if kind == "join" else "spectator")
+        elif kind == "leave":
+            self._leave(connection, _integer(message, "game"))
+        elif kind in ("open", "flag", "chord", "reset"):
+            game = self._game(message)
+            if connection not in game.players:
+                raise ValueError(f"Not a player of game {game.game_id}.")
+            self._move(game, kind, message)
+        else:
+            raise ValueError(f"Unknown message type {kind}.")
+
+    def _game(self, message):
+        """Return the game of the message."""
+        game = self.games.get(_integer(message, "game"))
+        if game is None:
+            raise ValueError(f"No game {message['game']}.")
+        return game
+
+    def _new_game(self, cells_x, cells_y, mines):
+        """Create a new game within the limits of the server."""
+        if len(self.games) >= self.settings.server_max_games:
+            raise ValueError("Too many games.")
+        if not (0 < cells_x * cells_y <= self.settings.server_max_cells
+                and 0 < cells_x and 0 <= mines < cells_x * cells_y):
+            raise ValueError("Board size or mines out of range.")
+        game = Game(self.next_id, cells_x, cells_y, mines)
+        self.games[game.game_id] = game
+        self.next_id += 1
+        shape = (cells_y, cells_x)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        return game
+
+    def _join(self, connection, game, role):
+        """Add the client to the game and send it the cells so far."""
+        (game.players if role == "player" else game.spectators).add(
+            connection)
+        connection.games.add(game.game_id)
+        connection.send(game.info(role))
+        cells = game.view_cells()
+        if len(cells):
+            connection.send(game.delta(cells))
+
+    def _leave(self, connection, game_id):
+        """Remove the client from the game, the game if nobody is left."""
+        game = self.games.get(game_id)
+        connection.games.discard(game_id)
+        if game is None:
+            return
+        game.players.discard(connection)
+        game.spectators.discard(connection)
+        if not game.players and not game.spectators:
+            self._close_game(game)
+
+    def _move(self, game, kind, message):
+        """Make the move and send the changed cells to everyone."""
+        game.last_move = time.monotonic()
+        if kind == "reset":
+            game.reset()
+            self._broadcast(game, {"type": "reset", "game": game.game_id})
+            return
+        row, column = _integer(message, "row"), _integer(message, "column")
+        if not (0 <= row < game.board.cells_y
+                and 0 <= column < game.board.cells_x):
+            raise ValueError("Cell out of the board.")
+        if kind == "open":
+            game.open_cell(row, column)
+        elif kind == "flag":
+            game.flag_cell(row, column)
+        else:
+            game.chord(row, column)
+        self._broadcast(game, game.pop_delta())
+
+    def _broadcast(self, game, message):
+        """Send the message to all players and spectators of the game."""
+        # Encoded once for all clients
+        data = json.dumps(message).encode() + b"\n"
+        for connection in game.players | game.spectators:
+            connection.send_data(data)
+
+    def _close_game(self, game):
+        """Forget the game and tell its clients."""
+        del self.games[game.game_id]
+        for connection in game.players | game.spectators:
+            connection.games.discard(game.game_id)
+            connection.send({"type": "closed", "game": game.game_id})
+        shape = (game.board.cells_y, game.board.cells_x)
+        self.shapes[shape] -= 1
+        if not self.shapes[shape]:
+            del self.shapes[shape]
+            forget_neighbour_table(*shape)
+
+    def _close_idle_games(self):
+        """Close games without moves for a long time."""
+        oldest = time.monotonic() - self.settings.server_idle_seconds
+        for game in [game for game in self.games.values()
+                     if game.last_move < oldest]:
+            self._close_game(game)
+
+
+def main():
+    """Parse command line arguments and run the server."""
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Minesweeper game server.")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer(settings).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
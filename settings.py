@@ -1,31 +1,103 @@
 """Module with all the settings for Minesweeper."""
 
+import os
+
 
 class Settings:
     """Class to handle game settings."""
 
-    def __init__(self):
-        """Initialize game settings."""
+    def __init__(self, cells_x=8, cells_y=8, mines=10):
+        """Initialize game settings, the board size can be changed."""
 
         # Game framerate
         self.game_framerate = 60
 
+        # Sleep until the next event instead of running at the framerate.
+        # The clock is then updated by an event every second.
+        self.idle_sleep = True
+
         # Background colour
         self.background_colour = (192, 192, 192)
+        # Colour of the frame around the hinted cell
+        self.hint_colour = (255, 215, 0)
 
         # Game mechanics settings
         self.scale = 3
-        self.mines = 10
-        self.cells_x = 8
-        self.cells_y = 8
+        self.mines = mines
+        self.cells_x = cells_x
+        self.cells_y = cells_y
         self.cell_size = 16 * self.scale
         self.emoji_size = 26 * self.scale
 
+        # Mines are placed with the first opened cell, which never has a
+        # mine. With safe_first_area its neighbours don't either, so the
+        # first cell always opens a region.
+        self.safe_first_area = False
+
+        # Index empty regions when the first one is opened, so one click
+        # opens a whole region at once instead of cell by cell.
+        self.index_regions = True
+
+        # Time every frame and show it with F3, also turned on by the
+        # --profile flag. Timings are written to profile.json and
+        # profile_trace.json when the game is closed.
+        self.profile = (os.environ.get("MINESWEEPER_PROFILE", "").lower()
+                        not in ("", "0", "false"))
+
+        # Print durations of the startup phases after the first frame and
+        # quit, turned on by the --profile-startup flag.
+        self.profile_startup = False
+
+        # Save the game in progress to save.bin on quit and every
+        # checkpoint_seconds while playing, it is resumed at start.
+        self.autosave = True
+        self.checkpoint_seconds = 30
+
+        # Save results of won games and record every game to replays.bin.
+        self.save_results = True
+        self.record_replays = True
+
+        # Address of the game server, python server.py listens on it and
+        # python minesweeper.py --connect plays against it.
+        self.server_host = "127.0.0.1"
+        self.server_port = 8765
+        # Limits of the server, which keep its memory bounded: number of
+        # games, cells of a game, bytes of a message from a client and
+        # bytes waiting to be sent to a client, slower clients are dropped.
+        # Games without moves for server_idle_seconds are closed.
+        self.server_max_games = 10000
+        self.server_max_cells = 2500
+        self.server_message_bytes = 4096
+        self.server_send_bytes = 1 << 20
+        self.server_idle_seconds = 600
+
+        # Largest group of frontier cells the solver enumerates exactly.
+        self.solver_max_cells = 24
+
+        # Only play boards which can be solved without guessing. They are
+        # generated in the background by worker processes, board_pool_size
+        # boards are kept ready.
+        self.no_guess = False
+        self.board_pool_size = 4
+        self.board_pool_workers = 1
+
+        # Zoom levels of the board, the game starts at scale.
+        self.zoom_scales = (0.5, 1, 1.5, 2, 3, 4, 6)
+        # Number of cells the board is scrolled by one step.
+        self.pan_cells = 3
+
         # Screen settings
         self.side_margin = 12 * self.scale
         self.top_margin = 55 * self.scale
         self.inner_margin = 3 * self.scale
-        self.screen_width = (self.cells_x * self.cell_size
-                             + 2*self.side_margin)
-        self.screen_height = (self.cells_y * self.cell_size
+        # Largest size of the board on the screen, bigger boards are
+        # scrolled.
+        self.max_board_width = 1200
+        self.max_board_height = 750
+        self.board_width = min(self.cells_x * self.cell_size,
+                               self.max_board_width)
+        self.board_height = min(self.cells_y * self.cell_size,
+                                self.max_board_height)
+        self.screen_width = self.board_width + 2*self.side_margin
+        self.screen_height = (self.board_height
                               + self.side_margin + self.top_margin)
@@ -0,0 +1,185 @@
+"""Command line simulator to play many Minesweeper games without a display.
+
+Example: python simulate.py --games 100000 --workers 8 --strategy simple
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from board import Board
+from settings import Settings
+from solver import Solver
+
+
+def random_strategy(board, game_random):
+    """Open a random closed cell."""
+    closed = np.flatnonzero(~board.opened & ~board.flagged)
+    cell = int(closed[game_random.randrange(len(closed))])
+    return "open", cell // board.cells_x, cell % board.cells_x
+
+
+def simple_strategy(board, game_random):
+    """Flag and chord around numbers where it is safe, else open randomly."""
+    for row, column in np.argwhere(board.opened & (board.counts > 0)):
+        row, column = int(row), int(column)
+        around = [(n_row, n_column) for n_row, n_column
+                  in board.neighbours(row, column)
+                  if not board.opened[n_row, n_column]]
+        flagged = [cell for cell in around if board.flagged[cell]]
+        if len(flagged) == len(around):
+            continue
+        # All closed cells around are mines.
+        if len(around) == board.counts[row, column]:
+            for cell in around:
+                if not board.flagged[cell]:
+                    return ("flag",) + cell
+        # All mines around are flagged.
+        if len(flagged) == board.counts[row, column]:
+            return "chord", row, column
+    return random_strategy(board, game_random)
+
+
+def solver_strategy(board, game_random):
+    """Open the safe cell or the least risky one found by the solver."""
+    return ("open",) + Solver(board).hint()
+
+
+# Strategies by name, others can be given as module:function.
+STRATEGIES = {
+    "random": random_strategy,
+    "simple": simple_strategy,
+    "solver": solver_strategy,
+}
+
+
+def load_strategy(name):
+    """Return strategy function with given name or module:function path."""
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module_name, _, function_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def game_seed(seed, index):
+    """Return seed of a game, which only depends on its index."""
+    return (seed << 32) + index
+
+
+def play_game(cells_x, cells_y, mines, seed, strategy):
+    """Play one game, return if it was won and number of moves."""
+    board = Board(cells_x, cells_y, mines, seed=seed)
+    game_random = random.Random(f"strategy-{seed}")
+
+    moves = 0
+    while board.exploded is None and not board.is_solved():
+        action, row, column = strategy(board, game_random)
+        # Mines are placed away from the first opened cell, like in the
+        # game.
+        if not board.mines_placed:
+            if action == "open":
+                board.create_mines(row, column)
+            else:
+                board.create_mines()
+        if action == "open":
+            board.open_cell(row, column)
+        elif action == "flag":
+            board.flag_cell(row, column)
+        elif action == "chord":
+            board.chord(row, column)
+        moves += 1
+    return board.exploded is None, moves
+
+
+def play_games(arguments):
+    """Play a chunk of games in a worker, return their results."""
+    cells_x, cells_y, mines, seed, strategy_name, first, last = arguments
+    strategy = load_strategy(strategy_name)
+    results = []
+    for index in range(first, last):
+        start = time.perf_counter()
+        won, moves = play_game(cells_x, cells_y, mines,
+                               game_seed(seed, index), strategy)
+        results.append((won, moves, time.perf_counter() - start))
+    return results
+
+
+def simulate(games, cells_x, cells_y, mines, seed=0, strategy="simple",
+             workers=1, chunk_size=1000):
+    """Play games in a process pool and return report of the results."""
+    chunks = [(cells_x, cells_y, mines, seed, strategy,
+               first, min(first + chunk_size, games))
+              for first in range(0, games, chunk_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_games(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(play_games, chunks)
+    duration = time.perf_counter() - start
+
+    # Chunks come back in order, so results don't depend on workers.
+    results = [result for chunk in results for result in chunk]
+    wins = np.array([result[0] for result in results])
+    moves = np.array([result[1] for result in results])
+    times = np.array([result[2] for result in results]) * 1000
+    return {
+        "games": games,
+        "cells_x": cells_x,
+        "cells_y": cells_y,
+        "mines": mines,
+        "seed": seed,
+        "strategy": strategy,
+        "workers": workers,
+        "wins": int(wins.sum()),
+        "win_rate": float(wins.mean()),
+        "moves_mean": float(moves.mean()),
+        "games_per_second": games / duration,
+        "game_ms": {
+            f"p{percentile}": float(np.percentile(times, percentile))
+            for percentile in (50, 90, 99)},
+    }
+
+
+def main():
+    """Parse command line arguments and print the report."""
+    settings = Settings()
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games without a display.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--cells-x", type=int, default=settings.cells_x)
+    parser.add_argument("--cells-y", type=int, default=settings.cells_y)
+    parser.add_argument("--mines", type=int, default=settings.mines)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategy", default="simple",
+                        help="strategy name or module:function")
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--json", action="store_true",
+                        help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = simulate(args.games, args.cells_x, args.cells_y, args.mines,
+                      args.seed, args.strategy, args.workers,
+                      args.chunk_size)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['games']} games on {args.cells_x}x{args.cells_y} "
+          f"({args.mines} mines) with {args.strategy} strategy")
+    print(f"Win rate: {report['win_rate']:.2%}")
+    print(f"Games per second: {report['games_per_second']:.0f}")
+    print("Game time: " + ", ".join(
+        f"{name} {value:.3f} ms"
+        for name, value in report["game_ms"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Module to save and resume games in a compact binary format.
+
+A snapshot has a fixed header with the board size, mines, seed, stats and
+elapsed time, followed by the mine, opened and flagged masks packed to
+one bit a cell each, so a cell takes 3 bits.
+"""
+
+import mmap
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+_MAGIC = b"MSSV"
+_VERSION = 1
+# Magic, version, cells_x, cells_y, mines, has seed, seed, state,
+# mines_left and elapsed seconds
+_HEADER = struct.Struct("<4sBIIIBQbid")
+
+# Queued to stop the writer thread
+_CLOSE = object()
+
+
+class Snapshot:
+    """Class to hold the saved state of a game."""
+
+    def __init__(self, cells_x, cells_y, mines, mines_mask, opened, flagged,
+                 seed=None, state=0, mines_left=0, elapsed=0.0):
+        """Initialize snapshot attributes, masks are of the board shape."""
+        self.cells_x = cells_x
+        self.cells_y = cells_y
+        self.mines = mines
+        self.mines_mask = mines_mask
+        self.opened = opened
+        self.flagged = flagged
+        self.seed = seed
+        self.state = state
+        self.mines_left = mines_left
+        self.elapsed = elapsed
+
+    @classmethod
+    def from_game(cls, board, stats, elapsed):
+        """Return snapshot of the board and stats of a game."""
+        return cls(board.cells_x, board.cells_y, board.mines_number,
+                   board.mines, board.opened, board.flagged, board.seed,
+                   stats["state"], stats["mines_left"], elapsed)
+
+    def to_bytes(self):
+        """Return the snapshot in the binary format."""
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, self.cells_x, self.cells_y, self.mines,
+            self.seed is not None, self.seed or 0, self.state,
+            self.mines_left, self.elapsed)
+        planes = [np.packbits(mask, axis=None).tobytes()
+                  for mask in (self.mines_mask, self.opened, self.flagged)]
+        return b"".join([header] + planes)
+
+    def restore(self, board):
+        """Give the saved state to a reset board of the same size."""
+        board.set_mines(np.flatnonzero(self.mines_mask))
+        board.seed = self.seed
+        board.opened[:] = self.opened
+        board.flagged[:] = self.flagged
+        board.count_closed_safe()
+        board.all_changed = True
+
+
+def save(path, data):
+    """Write snapshot bytes to path, replacing the old file at once."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file_object:
+        file_object.write(data)
+    os.replace(temporary, path)
+
+
+def load(path):
+    """Return the snapshot in path, its masks are read with a memory map."""
+    with open(path, "rb") as file_object:
+        memory = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, cells_x, cells_y, mines, has_seed, seed, state,
+     mines_left, elapsed) = _HEADER.unpack_from(memory)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a Minesweeper snapshot.")
+
+    size = cells_x * cells_y
+    plane_size = (size + 7) // 8
+    masks = []
+    for plane in range(3):
+        packed = np.frombuffer(memory, dtype=np.uint8, count=plane_size,
+                               offset=_HEADER.size + plane * plane_size)
+        masks.append(np.unpackbits(packed, count=size).view(bool)
+                     .reshape(cells_y, cells_x))
+    return Snapshot(cells_x, cells_y, mines, *masks,
+                    seed if has_seed else None, state, mines_left, elapsed)
+
+
+class SnapshotWriter:
+    """Class to write snapshots in a background thread.
+
+    The game only packs its state, so a checkpoint never waits for the
+    disk. Queued None removes the file.
+    """
+
+    def __init__(self, path):
+        """Start the writer thread."""
+        self.path = path
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+
+    def _write(self):
+        """Write queued snapshots until the writer is closed."""
+        while True:
+            data = self.queue.get()
+            if data is _CLOSE:
+                break
+            if data is not None:
+                save(self.path, data)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+    def checkpoint(self, snapshot):
+        """Queue the snapshot to be written."""
+        self.queue.put(snapshot.to_bytes())
+
+    def remove(self):
+        """Queue removing the saved game."""
+        self.queue.put(None)
+
+    def close(self):
+        """Write queued snapshots and stop the writer."""
+        self.queue.put(_CLOSE)
+        self.writer.join()
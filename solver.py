@@ -0,0 +1,312 @@
+"""Module with Solver class, which finds safe cells and mine probabilities."""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from board import neighbour_counts
+
+# Enumerated components by their constraints. Results only depend on the
+# constraints, so they are shared by all solvers and reused between moves.
+_enumerated = OrderedDict()
+_ENUMERATED_SIZE = 4096
+
+
+class Solver:
+    """Class to solve the revealed part of a board.
+
+    Every open number gives a constraint: the number of mines among its
+    closed neighbours. Trivial rules are applied first, then rules for
+    overlapping constraints. Remaining constraints are split into
+    independent frontier components, which are enumerated exactly.
+    """
+
+    def __init__(self, board, max_cells=24):
+        """Initialize solver attributes."""
+        self.board = board
+        # Bigger components are not enumerated, only estimated.
+        self.max_cells = max_cells
+
+        # Results of the last solve, cells are flat indexes.
+        self.safe_cells = set()
+        self.mine_cells = set()
+        self.probabilities = None
+
+    def solve(self):
+        """Find safe cells, mines and mine probabilities of closed cells.
+
+        Flags are trusted to be mines. Return probabilities as an array
+        of the board's shape, with NaN for open and flagged cells.
+        """
+        board = self.board
+        unknown = ~board.opened & ~board.flagged
+        constraints = self._constraints(unknown)
+        safe_cells, mine_cells, constraints = _apply_rules(constraints)
+
+        probabilities = np.full(board.mines.size, np.nan)
+        probabilities[list(safe_cells)] = 0
+        probabilities[list(mine_cells)] = 1
+
+        # Closed cells away from the frontier and mines left for the
+        # frontier and for them
+        rest = unknown.ravel().copy()
+        rest[list(safe_cells | mine_cells)] = False
+        mines_left = (board.mines_number - int(board.flagged.sum())
+                      - len(mine_cells))
+
+        components = []
+        for component in _split_components(constraints):
+            cells = set().union(*(cells for cells, _ in component))
+            rest[list(cells)] = False
+            if len(cells) > self.max_cells:
+                # Too big to enumerate, use average density around it.
+                for cell in cells:
+                    probabilities[cell] = np.mean([
+                        value / len(c_cells) for c_cells, value in component
+                        if cell in c_cells])
+                mines_left -= round(probabilities[list(cells)].sum())
+            else:
+                components.append(_enumerate(component))
+
+        self._combine(components, mines_left, rest, probabilities)
+
+        # Cells found by enumeration are certain too.
+        self.safe_cells = safe_cells | {
+            cell for cells, _ in components for cell in cells
+            if probabilities[cell] == 0}
+        self.mine_cells = mine_cells | {
+            cell for cells, _ in components for cell in cells
+            if probabilities[cell] == 1}
+        self.probabilities = probabilities.reshape(board.mines.shape)
+        return self.probabilities
+
+    def hint(self):
+        """Return row and column of a safe cell or the least risky one.
+
+        None is returned when there are no closed cells left.
+        """
+        probabilities = self.solve()
+        if self.safe_cells:
+            cell = min(self.safe_cells)
+        elif np.isnan(probabilities).all():
+            return None
+        else:
+            cell = int(np.nanargmin(probabilities))
+        return divmod(cell, self.board.cells_x)
+
+    def _constraints(self, unknown):
+        """Return constraints of all open numbers next to closed cells."""
+        board = self.board
+        flagged_around = neighbour_counts(board.flagged)
+        numbers = (board.opened & ~board.mines & (board.counts > 0)
+                   & (neighbour_counts(unknown) > 0))
+        unknown = unknown.reshape(-1)
+        values = (board.counts - flagged_around).reshape(-1)
+        constraints = set()
+        for cell in np.flatnonzero(numbers).tolist():
+            neighbours = board.neighbour_cells(cell)
+            cells = frozenset(neighbours[unknown[neighbours]].tolist())
+            constraints.add((cells, int(values[cell])))
+        return constraints
+
+    @staticmethod
+    def _combine(components, mines_left, rest, probabilities):
+        """Combine enumerated components with the rest of the board.
+
+        Every solution of the components is weighted by the number of
+        ways the remaining mines fit into the rest of closed cells.
+        """
+        cells_left = int(rest.sum())
+
+        def weight(mines):
+            if mines < 0 or mines > cells_left:
+                return 0
+            return math.comb(cells_left, mines)
+
+        def convolve(distributions):
+            total = {0: 1}
+            for distribution in distributions:
+                combined = {}
+                for mines, ways in total.items():
+                    for c_mines, c_ways in distribution.items():
+                        combined[mines + c_mines] = (
+                            combined.get(mines + c_mines, 0) + ways * c_ways)
+                total = combined
+            return total
+
+        distributions = [{mines: solutions[0]
+                          for mines, solutions in counts.items()}
+                         for _, counts in components]
+        everything = convolve(distributions)
+        norm = sum(ways * weight(mines_left - mines)
+                   for mines, ways in everything.items())
+        if norm == 0:
+            # Flags are wrong or the board is not started, use density.
+            density = mines_left / cells_left if cells_left > 0 else 0
+            probabilities[rest] = density
+            for cells, _ in components:
+                probabilities[list(cells)] = density
+            return
+
+        for index, (cells, counts) in enumerate(components):
+            others = convolve(distributions[:index]
+                              + distributions[index + 1:])
+            mine_ways = [0] * len(cells)
+            for mines, (_, cell_counts) in counts.items():
+                other_ways = sum(
+                    ways * weight(mines_left - mines - o_mines)
+                    for o_mines, ways in others.items())
+                for position, count in enumerate(cell_counts):
+                    mine_ways[position] += count * other_ways
+            for cell, ways in zip(cells, mine_ways):
+                probabilities[cell] = ways / norm
+
+        # Every unconstrained cell has the same probability.
+        if cells_left > 0:
+            ways = sum(
+                ways * math.comb(cells_left - 1, mines_left - mines - 1)
+                for mines, ways in everything.items()
+                if 0 <= mines_left - mines - 1 <= cells_left - 1)
+            probabilities[rest] = ways / norm
+
+
+def _apply_rules(constraints):
+    """Find safe cells and mines with trivial and overlap rules.
+
+    Return safe cells, mines and constraints of the remaining cells.
+    """
+    safe_cells = set()
+    mine_cells = set()
+    while True:
+        # Remove known cells from the constraints.
+        reduced = set()
+        for cells, value in constraints:
+            value -= len(cells & mine_cells)
+            cells = cells - safe_cells - mine_cells
+            if cells:
+                reduced.add((cells, value))
+        constraints = reduced
+
+        found = False
+        for cells, value in constraints:
+            if value == 0:
+                safe_cells |= cells
+                found = True
+            elif value == len(cells):
+                mine_cells |= cells
+                found = True
+        if found:
+            continue
+
+        # Compare constraints that share a cell.
+        by_cell = {}
+        for constraint in constraints:
+            for cell in constraint[0]:
+                by_cell.setdefault(cell, []).append(constraint)
+        for first in constraints:
+            for second in {other for cell in first[0]
+                           for other in by_cell[cell]}:
+                only_first = first[0] - second[0]
+                only_second = second[0] - first[0]
+                difference = second[1] - first[1]
+                if not only_second:
+                    continue
+                # Mines of the second one that don't fit into the first.
+                if difference == len(only_second):
+                    mine_cells |= only_second
+                    safe_cells |= only_first
+                    found = True
+                elif not only_first and difference == 0:
+                    safe_cells |= only_second
+                    found = True
+        if not found:
+            return safe_cells, mine_cells, constraints
+
+
+def _split_components(constraints):
+    """Split constraints into groups which share no cells."""
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        first = find(next(iter(cells)))
+        for cell in cells:
+            parent[find(cell)] = first
+
+    components = {}
+    for constraint in constraints:
+        root = find(next(iter(constraint[0])))
+        components.setdefault(root, []).append(constraint)
+    return list(components.values())
+
+
+def _enumerate(component):
+    """Count solutions of a component by the number of mines.
+
+    Return cells of the component and a dictionary mapping number of
+    mines to the number of solutions and number of solutions with a mine
+    for every cell.
+    """
+    key = frozenset(component)
+    result = _enumerated.get(key)
+    if result is not None:
+        _enumerated.move_to_end(key)
+        return result
+
+    # Cells in order of constraints, so they are checked early.
+    cells = []
+    for constraint_cells, _ in sorted(component, key=lambda c: min(c[0])):
+        for cell in sorted(constraint_cells):
+            if cell not in cells:
+                cells.append(cell)
+    position = {cell: index for index, cell in enumerate(cells)}
+    values = [value for _, value in component]
+    cell_constraints = [[] for _ in cells]
+    left = []
+    for index, (constraint_cells, _) in enumerate(component):
+        left.append(len(constraint_cells))
+        for cell in constraint_cells:
+            cell_constraints[position[cell]].append(index)
+    mines_in = [0] * len(component)
+
+    counts = {}
+    assignment = [0] * len(cells)
+
+    def assign(index, mines):
+        if index == len(cells):
+            solutions = counts.setdefault(mines, [0, [0] * len(cells)])
+            solutions[0] += 1
+            for position, mine in enumerate(assignment):
+                solutions[1][position] += mine
+            return
+        for mine in (0, 1):
+            possible = True
+            for constraint in cell_constraints[index]:
+                mines_in[constraint] += mine
+                left[constraint] -= 1
+                if (mines_in[constraint] > values[constraint]
+                        or mines_in[constraint] + left[constraint]
+                        < values[constraint]):
+                    possible = False
+            if possible:
+                assignment[index] = mine
+                assign(index + 1, mines + mine)
+            for constraint in cell_constraints[index]:
+                mines_in[constraint] -= mine
+                left[constraint] += 1
+        assignment[index] = 0
+
+    assign(0, 0)
+    result = (tuple(cells), counts)
+    _enumerated[key] = result
+    if len(_enumerated) > _ENUMERATED_SIZE:
+        _enumerated.popitem(last=False)
+    return result
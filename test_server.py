@@ -0,0 +1,117 @@
+"""Tests of the game server with messages of a hostile client.
+
+Example: python -m unittest test_server
+"""
+
+import asyncio
+import json
+import unittest
+
+from server import GameServer
+from settings import Settings
+
+# Lines the server has to answer with an error, keeping the connection.
+HOSTILE_LINES = [
+    b"not json\n",
+    b"\xff\xfe\n",
+    b"null\n",
+    b"[1, 2, 3]\n",
+    b'"new"\n',
+    b"12\n",
+    b"[" * 2000 + b"\n",
+    b'{"a":' * 800 + b"\n",
+    b"{}\n",
+    b'{"type": "explode"}\n',
+    b'{"type": ["new"]}\n',
+    b'{"type": "new", "cells_x": 8, "cells_y": 8}\n',
+    b'{"type": "new", "cells_x": 1e400, "cells_y": 8, "mines": 10}\n',
+    b'{"type": "new", "cells_x": 8.0, "cells_y": 8, "mines": 10}\n',
+    b'{"type": "new", "cells_x": true, "cells_y": 8, "mines": 10}\n',
+    b'{"type": "new", "cells_x": "8", "cells_y": 8, "mines": 10}\n',
+    b'{"type": "new", "cells_x": 10000000000000000000000, "cells_y": 8, '
+    b'"mines": 10}\n',
+    b'{"type": "new", "cells_x": -8, "cells_y": -8, "mines": 10}\n',
+    b'{"type": "new", "cells_x": 8, "cells_y": 8, "mines": 64}\n',
+    b'{"type": "join", "game": 1.5}\n',
+    b'{"type": "watch", "game": 99}\n',
+]
+
+# Moves with cells out of the board or no cells, sent to a game of the
+# client.
+HOSTILE_MOVES = [
+    {"type": "open", "row": 8, "column": 0},
+    {"type": "open", "row": -1, "column": 0},
+    {"type": "flag", "row": 0, "column": 10**30},
+    {"type": "chord", "row": 1e400, "column": 0},
+    {"type": "open", "row": None, "column": 0},
+    {"type": "open", "column": 0},
+]
+
+
+class HostileClientTest(unittest.IsolatedAsyncioTestCase):
+    """Send broken and hostile messages to a server."""
+
+    async def asyncSetUp(self):
+        """Start a server on a free port and connect to it."""
+        self.game_server = GameServer(Settings())
+        self.server = await asyncio.start_server(
+            self.game_server._handle, "127.0.0.1", 0,
+            limit=self.game_server.settings.server_message_bytes)
+        port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection(
+            "127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        """Close the connection and the server."""
+        self.writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def send(self, data):
+        """Send a raw line and return the message of the answer."""
+        self.writer.write(data)
+        await self.writer.drain()
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        self.assertTrue(line, f"connection closed after {data[:40]!r}")
+        return json.loads(line)
+
+    async def new_game(self):
+        """Start a beginner game and return its message."""
+        message = await self.send(
+            b'{"type": "new", "cells_x": 8, "cells_y": 8, "mines": 10}\n')
+        self.assertEqual(message["type"], "game")
+        return message
+
+    async def test_hostile_lines(self):
+        """Every hostile line gets an error and the client can play on."""
+        for line in HOSTILE_LINES:
+            with self.subTest(line=line[:40]):
+                message = await self.send(line)
+                self.assertEqual(message["type"], "error")
+        await self.new_game()
+
+    async def test_hostile_moves(self):
+        """Moves with bad cells get an error and change nothing."""
+        game = (await self.new_game())["game"]
+        for move in HOSTILE_MOVES:
+            with self.subTest(move=move):
+                message = await self.send(
+                    json.dumps(dict(move, game=game)).encode() + b"\n")
+                self.assertEqual(message["type"], "error")
+        self.assertEqual(self.game_server.games[game].state, 2)
+        message = await self.send(json.dumps(
+            {"type": "open", "game": game, "row": 0, "column": 0}).encode()
+            + b"\n")
+        self.assertEqual(message["type"], "delta")
+
+    async def test_too_long_line(self):
+        """A line over the message limit closes the connection."""
+        self.writer.write(b"[" * 10000 + b"\n")
+        await self.writer.drain()
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        self.assertEqual(line, b"")
+        self.assertFalse(self.game_server.games)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Module with Viewport class for Minesweeper."""
+
+import pygame
+
+
+class Viewport:
+    """Class to represent the visible part of the board."""
+
+    def __init__(self, minesweeper):
+        """Initialize viewport attributes."""
+        self.settings = minesweeper.settings
+
+        # Area of the screen where the board is shown
+        self.rect = pygame.Rect(
+            self.settings.side_margin, self.settings.top_margin,
+            self.settings.board_width, self.settings.board_height)
+
+        # Current zoom, cell size changes with the scale.
+        self.scale_index = self.settings.zoom_scales.index(
+            self.settings.scale)
+        self.scale = self.settings.scale
+        self.cell_size = self.settings.cell_size
+
+        # Position of the top left corner of the view on the board,
+        # in pixels of the current cell size.
+        self.x = 0
+        self.y = 0
+
+        # Movement since the last pop_moved call
+        self.moved_x = 0
+        self.moved_y = 0
+        self.zoomed = False
+
+    def cell_at(self, mouse_pos):
+        """Return row and column of the cell under the mouse or None."""
+        if not self.rect.collidepoint(mouse_pos):
+            return None
+        column = (mouse_pos[0] - self.rect.x + self.x) // self.cell_size
+        row = (mouse_pos[1] - self.rect.y + self.y) // self.cell_size
+        if (column < self.settings.cells_x
+                and row < self.settings.cells_y):
+            return row, column
+        return None
+
+    def visible_cells(self, area=None):
+        """Return rows and columns range of cells visible in area.
+
+        Area is given in view coordinates, the whole view by default.
+        """
+        if area is None:
+            area = pygame.Rect((0, 0), self.rect.size)
+        first_column = (self.x + area.left) // self.cell_size
+        first_row = (self.y + area.top) // self.cell_size
+        last_column = min((self.x + area.right - 1) // self.cell_size + 1,
+                          self.settings.cells_x)
+        last_row = min((self.y + area.bottom - 1) // self.cell_size + 1,
+                       self.settings.cells_y)
+        return first_row, last_row, first_column, last_column
+
+    def pan(self, x_change, y_change):
+        """Move the view by given number of pixels."""
+        x = self._clamp(self.x + x_change, self.settings.cells_x,
+                        self.rect.width)
+        y = self._clamp(self.y + y_change, self.settings.cells_y,
+                        self.rect.height)
+        self.moved_x += x - self.x
+        self.moved_y += y - self.y
+        self.x = x
+        self.y = y
+
+    def zoom(self, steps, mouse_pos=None):
+        """Zoom in or out by steps and keep the cell under the mouse."""
+        scale_index = min(max(self.scale_index + steps, 0),
+                          len(self.settings.zoom_scales) - 1)
+        if scale_index == self.scale_index:
+            return
+        if mouse_pos is None or not self.rect.collidepoint(mouse_pos):
+            mouse_pos = self.rect.center
+        view_x = mouse_pos[0] - self.rect.x
+        view_y = mouse_pos[1] - self.rect.y
+
+        # Board position under the mouse in cells
+        board_x = (self.x + view_x) / self.cell_size
+        board_y = (self.y + view_y) / self.cell_size
+
+        self.scale_index = scale_index
+        self.scale = self.settings.zoom_scales[scale_index]
+        self.cell_size = int(16 * self.scale)
+        self.x = self._clamp(int(board_x * self.cell_size) - view_x,
+                             self.settings.cells_x, self.rect.width)
+        self.y = self._clamp(int(board_y * self.cell_size) - view_y,
+                             self.settings.cells_y, self.rect.height)
+        self.zoomed = True
+
+    def _clamp(self, position, cells, view_size):
+        """Keep the view position inside the board."""
+        return min(max(position, 0),
+                   max(cells * self.cell_size - view_size, 0))
+
+    def pop_moved(self):
+        """Return movement and zoom since the last call and forget them."""
+        moved = (self.moved_x, self.moved_y, self.zoomed)
+        self.moved_x = 0
+        self.moved_y = 0
+        self.zoomed = False
+        return moved